@@ -4,7 +4,10 @@ OpenRoute Navigator - API Routes
 FastAPI route definitions
 """
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from typing import Union
 from app.models.schemas import (
     RouteRequest,
@@ -23,9 +26,64 @@ geocoding_service = GeocodingService()
 routing_service = RoutingService()
 
 
+def _inline_schema(model) -> dict:
+    """
+    JSON schema of a model with its $defs references inlined
+    
+    Args:
+        model: Pydantic model class
+        
+    Returns:
+        Self-contained schema, embeddable in an OpenAPI operation
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+    
+    return resolve(schema)
+
+
+async def parse_route_request(request: Request) -> RouteRequest:
+    """
+    Validate the raw request body straight from JSON
+    
+    Skips FastAPI's json.loads -> model_validate pipeline in favour of
+    Pydantic's single-pass model_validate_json.
+    
+    Args:
+        request: Incoming HTTP request
+        
+    Returns:
+        Validated RouteRequest
+    """
+    try:
+        return RouteRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
 @router.post(
     "/calculate",
     response_model=RouteResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": _inline_schema(RouteRequest)}
+            },
+            "required": True
+        }
+    },
     responses={
         400: {"model": ErrorResponse},
         500: {"model": ErrorResponse}
@@ -43,7 +101,7 @@ routing_service = RoutingService()
     Returns routes with geometry and alerts (green/yellow/red).
     """
 )
-async def calculate_route(request: RouteRequest):
+async def calculate_route(request: RouteRequest = Depends(parse_route_request)):
     """
     Calculate routes between origin and destination
     
@@ -54,9 +112,20 @@ async def calculate_route(request: RouteRequest):
         RouteResponse with multiple route alternatives
     """
     try:
+        # Geocode origin and destination concurrently when given as addresses
+        origin_task = (
+            asyncio.create_task(geocoding_service.geocode(request.origin))
+            if isinstance(request.origin, str) else None
+        )
+        dest_task = (
+            asyncio.create_task(geocoding_service.geocode(request.destination))
+            if isinstance(request.destination, str) else None
+        )
+        await asyncio.gather(*(t for t in (origin_task, dest_task) if t))
+        
         # Resolve origin coordinates
-        if isinstance(request.origin, str):
-            origin_coords = geocoding_service.geocode(request.origin)
+        if origin_task:
+            origin_coords = origin_task.result()
             if not origin_coords:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -71,8 +140,8 @@ async def calculate_route(request: RouteRequest):
                 )
         
         # Resolve destination coordinates
-        if isinstance(request.destination, str):
-            dest_coords = geocoding_service.geocode(request.destination)
+        if dest_task:
+            dest_coords = dest_task.result()
             if not dest_coords:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,17 +156,23 @@ async def calculate_route(request: RouteRequest):
                 )
         
         # Calculate routes
-        routes = routing_service.calculate_routes(
+        routes = await routing_service.calculate_routes(
             origin=origin_coords,
             destination=dest_coords,
             vehicle=request.vehicle
         )
         
-        return RouteResponse(
+        # Every field is already validated or built by the services:
+        # serialize directly instead of revalidating against response_model
+        response = RouteResponse.model_construct(
             routes=routes,
             origin_coords=origin_coords,
             destination_coords=dest_coords
         )
+        return Response(
+            content=RouteResponse.__pydantic_serializer__.to_json(response),
+            media_type="application/json"
+        )
         
     except HTTPException:
         raise
@@ -4,9 +4,68 @@ OpenRoute Navigator - Main Application
 FastAPI application entry point
 """
 
+import logging
+import logging.config
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api import routes
+from app.services import scoring
+from app.utils import geo
+
+
+# Logging for the app.* loggers; records are written to the console by a
+# background listener thread so request handlers never block on stdout
+LOGGING_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s [%(name)s] %(message)s"}
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"}
+    },
+    "loggers": {
+        "app": {"level": "INFO", "handlers": ["console"], "propagate": False}
+    }
+}
+
+
+def configure_logging() -> QueueListener:
+    """
+    Apply LOGGING_CONFIG and move its handlers behind a queue
+    
+    Returns:
+        Listener draining the queue into the configured handlers (not started)
+    """
+    logging.config.dictConfig(LOGGING_CONFIG)
+    app_logger = logging.getLogger("app")
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *app_logger.handlers, respect_handler_level=True)
+    app_logger.handlers = [QueueHandler(log_queue)]
+    return listener
+
+
+log_listener = configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: start the log listener and compile JIT kernels on
+    startup, release pooled HTTP connections on shutdown
+    """
+    log_listener.start()
+    geo.warm_up()
+    scoring.warm_up()
+    yield
+    await routes.geocoding_service.aclose()
+    await routes.routing_service.overpass.aclose()
+    log_listener.stop()
 
 
 # Create FastAPI application
@@ -34,7 +93,9 @@ app = FastAPI(
     },
     license_info={
         "name": "MIT License"
-    }
+    },
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 
@@ -47,6 +108,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses (route geometries are mostly repetitive coordinates);
+# only applied when the client sends Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # Include routers
 app.include_router(routes.router)
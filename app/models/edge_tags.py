@@ -0,0 +1,37 @@
+"""
+OpenRoute Navigator - Edge Tags
+
+Compact per-way tag records shared by every edge of the road graph
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class EdgeTags:
+    """
+    Parsed OSM tags of a single way
+
+    One instance is created per way; the graph edges only store its
+    index (tag_id) instead of carrying their own copy of every tag.
+    The scored tags are also kept interned as integer IDs into the
+    osm_weights lookup tables.
+    """
+    highway: str
+    surface: Optional[str]
+    smoothness: Optional[str]
+    tracktype: Optional[str]
+    lit: Optional[str]
+    traffic_signals: Optional[str]
+    maxspeed: Optional[int]
+    maxheight: Optional[float]
+    maxweight: Optional[float]
+    hgv: Optional[str]
+    access: Optional[str]
+    lanes: Optional[int]
+    oneway: bool
+    name: str
+    highway_id: int     # index into HIGHWAY_TABLE
+    surface_id: int     # index into SURFACE_TABLE
+    smoothness_id: int  # index into SMOOTHNESS_TABLE
@@ -0,0 +1,42 @@
+"""
+OpenRoute Navigator - Road Graph
+
+Array-backed directed road graph produced by OverpassService.build_graph
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+import numpy as np
+from app.models.edge_tags import EdgeTags
+
+
+@dataclass(slots=True)
+class RoadGraph:
+    """
+    Directed road graph stored as parallel arrays
+
+    Nodes are integer indices; index 0 is the origin and index 1 the
+    destination. Each directed edge is one position in the edge arrays,
+    so two-way streets appear twice and parallel edges are kept.
+    """
+    ORIGIN = 0
+    DESTINATION = 1
+
+    node_ids: List          # node index -> OSM node id ("origin"/"destination")
+    lats: np.ndarray        # latitude of each node
+    lons: np.ndarray        # longitude of each node
+    rows: np.ndarray        # source node index of each edge
+    cols: np.ndarray        # target node index of each edge
+    distances: np.ndarray   # length of each edge in km
+    seg_lats: np.ndarray    # latitude of each edge midpoint
+    seg_lons: np.ndarray    # longitude of each edge midpoint
+    tag_ids: np.ndarray     # way tag index of each edge (-1 = connector)
+    weights: np.ndarray     # (edges, criteria) weights, see ScoringService.CRITERIA
+    edge_tags: List[EdgeTags]  # way tags, indexed by tag_ids
+    way_columns: Dict[str, np.ndarray]  # interned/numeric way tags, indexed by tag_ids
+    weight_cache: Dict = field(default_factory=dict)  # see ScoringService.precompute
+
+    @property
+    def num_nodes(self) -> int:
+        """Number of nodes, terminals included"""
+        return len(self.node_ids)
@@ -5,11 +5,18 @@ Data models for request/response validation
 """
 
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Strict validation: no type coercion and no unknown fields. JSON numbers
+# are still accepted for float fields and nested objects for submodels.
+STRICT_CONFIG = ConfigDict(strict=True, extra="forbid")
 
 
 class VehicleParams(BaseModel):
     """Vehicle parameters for route calculation"""
+    model_config = STRICT_CONFIG
+
     vehicle_type: Literal["car", "truck", "motorcycle"] = Field(
         default="car",
         description="Type of vehicle"
@@ -30,12 +37,16 @@ class VehicleParams(BaseModel):
 
 class Coordinates(BaseModel):
     """Geographic coordinates"""
+    model_config = STRICT_CONFIG
+
     lat: float = Field(..., ge=-90, le=90, description="Latitude")
     lon: float = Field(..., ge=-180, le=180, description="Longitude")
 
 
 class RouteRequest(BaseModel):
     """Route calculation request"""
+    model_config = STRICT_CONFIG
+
     origin: str | Coordinates = Field(
         ...,
         description="Origin address or coordinates"
@@ -49,17 +60,11 @@ class RouteRequest(BaseModel):
         description="Vehicle parameters"
     )
 
-    @field_validator('origin', 'destination', mode='before')
-    @classmethod
-    def validate_location(cls, v):
-        """Allow both string addresses and coordinate dictionaries"""
-        if isinstance(v, dict):
-            return Coordinates(**v)
-        return v
-
 
 class Alert(BaseModel):
     """Route alert"""
+    model_config = STRICT_CONFIG
+
     level: Literal["green", "yellow", "red"] = Field(
         ...,
         description="Alert severity level"
@@ -76,6 +81,8 @@ class Alert(BaseModel):
 
 class Route(BaseModel):
     """Individual route information"""
+    model_config = STRICT_CONFIG
+
     type: Literal["fastest", "best_surface", "safest", "truck_compatible"] = Field(
         ...,
         description="Route optimization criterion"
@@ -101,6 +108,8 @@ class Route(BaseModel):
 
 class RouteResponse(BaseModel):
     """Route calculation response"""
+    model_config = STRICT_CONFIG
+
     routes: List[Route] = Field(
         ...,
         description="Alternative routes with different optimization criteria"
@@ -117,5 +126,7 @@ class RouteResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response"""
+    model_config = STRICT_CONFIG
+
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(default=None, description="Detailed error information")
@@ -4,21 +4,47 @@ OpenRoute Navigator - Geocoding Service
 Handles address-to-coordinate conversion using Nominatim API
 """
 
-import requests
+import logging
+import time
+import httpx
+from collections import OrderedDict
 from typing import Tuple, Optional
 from app.models.schemas import Coordinates
 
 
+logger = logging.getLogger(__name__)
+
+
 class GeocodingService:
     """Service for geocoding addresses using Nominatim"""
     
+    # Geocoding results cache: bounded LRU with per-entry expiry
+    CACHE_MAXSIZE = 4096
+    CACHE_TTL = 86400  # seconds
+    
     def __init__(self):
         self.base_url = "https://nominatim.openstreetmap.org"
         self.headers = {
             "User-Agent": "OpenRouteNavigator/1.0"
         }
+
+        # Shared async client: keeps TLS connections to Nominatim alive
+        # between requests instead of reconnecting on every call.
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+
+        # normalized address -> (expires_at, (lat, lon)). Plain tuples are
+        # cached rather than Coordinates so entries stay small and immutable.
+        self._cache: "OrderedDict[str, Tuple[float, Tuple[float, float]]]" = OrderedDict()
     
-    def geocode(self, address: str) -> Optional[Coordinates]:
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client (called on application shutdown)"""
+        await self._client.aclose()
+    
+    async def geocode(self, address: str) -> Optional[Coordinates]:
         """
         Convert address to coordinates
         
@@ -28,6 +54,11 @@ class GeocodingService:
         Returns:
             Coordinates object or None if geocoding fails
         """
+        key = address.strip().lower()
+        cached = self._cache_get(key)
+        if cached is not None:
+            return Coordinates(lat=cached[0], lon=cached[1])
+        
         try:
             params = {
                 "q": address,
@@ -35,11 +66,9 @@ class GeocodingService:
                 "limit": 1
             }
             
-            response = requests.get(
+            response = await self._client.get(
                 f"{self.base_url}/search",
-                params=params,
-                headers=self.headers,
-                timeout=10
+                params=params
             )
             response.raise_for_status()
             
@@ -49,16 +78,36 @@ class GeocodingService:
                 return None
             
             result = results[0]
-            return Coordinates(
-                lat=float(result["lat"]),
-                lon=float(result["lon"])
-            )
+            lat, lon = float(result["lat"]), float(result["lon"])
+            self._cache_put(key, (lat, lon))
+            return Coordinates(lat=lat, lon=lon)
             
         except Exception as e:
-            print(f"Geocoding error for '{address}': {e}")
+            logger.warning("Geocoding error for '%s': %s", address, e)
+            return None
+    
+    def _cache_get(self, key: str) -> Optional[Tuple[float, float]]:
+        """Return a cached (lat, lon) for key, or None if missing or expired"""
+        entry = self._cache.get(key)
+        if entry is None:
             return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        
+        self._cache.move_to_end(key)
+        return value
+    
+    def _cache_put(self, key: str, value: Tuple[float, float]) -> None:
+        """Store (lat, lon) for key, evicting the least recently used entry"""
+        self._cache[key] = (time.monotonic() + self.CACHE_TTL, value)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
     
-    def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
+    async def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
         """
         Convert coordinates to address
         
@@ -76,11 +125,9 @@ class GeocodingService:
                 "format": "json"
             }
             
-            response = requests.get(
+            response = await self._client.get(
                 f"{self.base_url}/reverse",
-                params=params,
-                headers=self.headers,
-                timeout=10
+                params=params
             )
             response.raise_for_status()
             
@@ -88,7 +135,7 @@ class GeocodingService:
             return result.get("display_name")
             
         except Exception as e:
-            print(f"Reverse geocoding error for ({lat}, {lon}): {e}")
+            logger.warning("Reverse geocoding error for (%s, %s): %s", lat, lon, e)
             return None
     
     def validate_coordinates(self, coords: Coordinates) -> bool:
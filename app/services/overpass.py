@@ -4,11 +4,32 @@ OpenRoute Navigator - Overpass API Service
 Handles OSM data retrieval via Overpass API
 """
 
-import time
-import requests
-import networkx as nx
+import asyncio
+import logging
+import math
+from functools import lru_cache
+import diskcache
+import httpx
+import ijson
+import numpy as np
+from scipy.spatial import cKDTree
 from typing import Dict, List, Tuple, Optional
+from app.models.edge_tags import EdgeTags
+from app.models.road_graph import RoadGraph
 from app.models.schemas import Coordinates
+from app.services.scoring import ScoringService
+from app.utils.geo import haversine_km
+from app.utils.osm_weights import (
+    HIGHWAY_ID,
+    SURFACE_ID,
+    SMOOTHNESS_ID,
+    HGV_ID,
+    ACCESS_ID,
+    intern_tag
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 class OverpassService:
@@ -28,11 +49,31 @@ class OverpassService:
     # has time to return its own error message instead of a silent hang.
     HTTP_TIMEOUT = QUERY_TIMEOUT + 15  # seconds
 
+    # On-disk cache of Overpass responses. Bounding boxes are snapped
+    # outward to a grid so that nearby requests share the same tile;
+    # OSM data changes slowly, so a cached tile stays valid for hours.
+    CACHE_DIR = "/tmp/overpass"
+    CACHE_GRID = 0.02  # degrees (same as the default bbox padding)
+    CACHE_TTL = 6 * 3600  # seconds
+    CACHE_FORMAT = 1  # bump whenever the cached OSM data layout changes
+
+    # Decoded Overpass elements handed to a worker thread at a time while
+    # stream-parsing, so compaction never runs on the event loop
+    PARSE_BATCH = 10_000
+
     def __init__(self):
-        # Cached list of automotive service locations (lat, lon, type)
-        # Populated after query_osm_data() is called via query_automotive_services()
-        self.fuel_stations: List[Tuple[float, float]] = []
-        self.repair_shops: List[Tuple[float, float]] = []
+        self.cache = diskcache.Cache(self.CACHE_DIR, size_limit=2**30)
+
+        # Shared async client with keep-alive pooling across mirrors
+        self._client = httpx.AsyncClient(
+            timeout=self.HTTP_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client (called on application shutdown)"""
+        await self._client.aclose()
+        self.cache.close()
     
     def build_query(self, bbox: Tuple[float, float, float, float]) -> str:
         """
@@ -100,21 +141,60 @@ class OverpassService:
         
         return (min_lat, min_lon, max_lat, max_lon)
     
-    def query_osm_data(self, bbox: Tuple[float, float, float, float]) -> Dict:
+    def snap_bbox(
+        self,
+        bbox: Tuple[float, float, float, float]
+    ) -> Tuple[float, float, float, float]:
+        """
+        Expand a bounding box outward to the cache grid
+        
+        The snapped box always contains the original one, so a cached
+        tile covers every request that snaps to the same key.
+        
+        Args:
+            bbox: Bounding box (min_lat, min_lon, max_lat, max_lon)
+            
+        Returns:
+            Snapped bounding box tuple
+        """
+        grid = self.CACHE_GRID
+        min_lat, min_lon, max_lat, max_lon = bbox
+        
+        return (
+            round(math.floor(min_lat / grid) * grid, 6),
+            round(math.floor(min_lon / grid) * grid, 6),
+            round(math.ceil(max_lat / grid) * grid, 6),
+            round(math.ceil(max_lon / grid) * grid, 6)
+        )
+    
+    async def query_osm_data(self, bbox: Tuple[float, float, float, float]) -> Dict:
         """
         Fetch road network AND automotive service POIs in a single Overpass
-        API request. Automotive service locations are parsed here and stored
-        in self.fuel_stations / self.repair_shops for use by ScoringService.
+        API request. Automotive service locations are returned in the
+        "fuel_stations" / "repair_shops" entries of the OSM data, from which
+        each request builds its own ScoringService.
 
         Tries each mirror in ENDPOINTS in order and retries up to 3 times
-        with a short back-off before giving up.
+        with a short back-off before giving up. Responses are stream-parsed
+        (see _parse_osm_stream) and cached on disk per grid-snapped bbox
+        (see snap_bbox), so repeat requests in the same area skip the
+        Overpass call entirely.
 
         Args:
             bbox: Bounding box for query
 
         Returns:
-            Raw OSM data dictionary (ways + nodes for road graph builder)
+            Compact OSM data dictionary (nodes + ways for road graph builder)
         """
+        bbox = self.snap_bbox(bbox)
+        cache_key = ("osm", self.CACHE_FORMAT, *bbox)
+
+        # Disk read + unpickling of a large tile: keep it off the event loop
+        osm_data = await asyncio.to_thread(self.cache.get, cache_key)
+        if osm_data is not None:
+            self._log_automotive_services(osm_data)
+            return osm_data
+
         query = self.build_query(bbox)
 
         last_error: Exception = Exception("No Overpass endpoints available")
@@ -122,125 +202,221 @@ class OverpassService:
         for endpoint in self.ENDPOINTS:
             for attempt in range(1, 4):  # 3 attempts per endpoint
                 try:
-                    response = requests.post(
+                    async with self._client.stream(
+                        "POST",
                         endpoint,
-                        data={"data": query},
-                        timeout=self.HTTP_TIMEOUT,
+                        data={"data": query}
+                    ) as response:
+
+                        # 429 = rate-limited, 504 = gateway timeout → retry
+                        if response.status_code in (429, 504):
+                            wait = attempt * 2  # 2s, 4s, 6s
+                            logger.warning(
+                                "%s returned HTTP %s (attempt %s/3). Retrying in %ss...",
+                                endpoint, response.status_code, attempt, wait
+                            )
+                            await asyncio.sleep(wait)
+                            last_error = Exception(
+                                f"Overpass API unavailable (HTTP {response.status_code}). "
+                                "The public OSM servers are temporarily overloaded — "
+                                "please try again in a few moments."
+                            )
+                            continue
+
+                        response.raise_for_status()
+                        osm_data = await self._parse_osm_stream(response)
+
+                    await asyncio.to_thread(
+                        self.cache.set, cache_key, osm_data, expire=self.CACHE_TTL
                     )
 
-                    # 429 = rate-limited, 504 = gateway timeout → retry
-                    if response.status_code in (429, 504):
-                        wait = attempt * 2  # 2s, 4s, 6s
-                        print(
-                            f"[OverpassService] {endpoint} returned HTTP "
-                            f"{response.status_code} (attempt {attempt}/3). "
-                            f"Retrying in {wait}s..."
-                        )
-                        time.sleep(wait)
-                        last_error = Exception(
-                            f"Overpass API unavailable (HTTP {response.status_code}). "
-                            "The public OSM servers are temporarily overloaded — "
-                            "please try again in a few moments."
-                        )
-                        continue
-
-                    response.raise_for_status()
-                    osm_data = response.json()
-
-                    # Parse automotive service locations from the same response.
-                    self._extract_automotive_services(osm_data)
+                    self._log_automotive_services(osm_data)
                     return osm_data
 
-                except requests.exceptions.Timeout:
+                except httpx.TimeoutException:
                     last_error = Exception(
                         "Overpass API timed out. Try a smaller area or retry later."
                     )
-                    print(
-                        f"[OverpassService] {endpoint} timed out "
-                        f"(attempt {attempt}/3)."
+                    logger.warning(
+                        "%s timed out (attempt %s/3).", endpoint, attempt
                     )
-                    time.sleep(attempt * 2)
+                    await asyncio.sleep(attempt * 2)
                     continue
 
-                except requests.exceptions.RequestException as exc:
+                except httpx.HTTPError as exc:
                     last_error = Exception(f"Overpass API network error: {exc}")
-                    print(
-                        f"[OverpassService] {endpoint} network error: {exc} "
-                        f"(attempt {attempt}/3)."
+                    logger.warning(
+                        "%s network error: %s (attempt %s/3).", endpoint, exc, attempt
                     )
                     break  # Network error on this endpoint — try next mirror
 
         raise last_error
 
-    def _extract_automotive_services(self, osm_data: Dict) -> None:
+    async def _parse_osm_stream(self, response: httpx.Response) -> Dict:
         """
-        Parse fuel stations and repair shops from an already-fetched OSM
-        response and populate self.fuel_stations / self.repair_shops.
+        Stream-parse an Overpass JSON response into compact OSM data
 
-        Called internally by query_osm_data() — no extra HTTP request needed.
+        Elements are decoded incrementally as the body arrives (ijson push
+        parser), so neither the raw payload nor the full element list is
+        ever held in memory: every PARSE_BATCH elements are compacted in a
+        worker thread (nodes to (lat, lon) tuples, ways to (node ids, tags)
+        pairs, POIs picked up on the way), and the road node index is built
+        in one as well, keeping the event loop free for other requests.
 
         Args:
-            osm_data: Raw JSON response from Overpass API
+            response: Streaming Overpass response
+
+        Returns:
+            OSM data dictionary with "nodes", "ways", "fuel_stations",
+            "repair_shops" and the road node index (see _index_road_nodes)
         """
-        fuel: List[Tuple[float, float]] = []
-        repair: List[Tuple[float, float]] = []
+        osm_data: Dict = {
+            "nodes": {},
+            "ways": [],
+            "fuel_stations": [],
+            "repair_shops": []
+        }
+
+        elements = ijson.sendable_list()
+        parser = ijson.items_coro(elements, "elements.item", use_float=True)
+
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            if len(elements) >= self.PARSE_BATCH:
+                await asyncio.to_thread(self._collect_elements, osm_data, elements[:])
+                del elements[:]
 
-        for element in osm_data.get("elements", []):
-            # Only nodes can be POIs; ways are road segments
-            if element.get("type") != "node":
-                continue
+        parser.close()
+        await asyncio.to_thread(self._collect_elements, osm_data, elements[:])
 
-            tags = element.get("tags")
-            if not tags:  # bare road nodes have no tags — skip quickly
-                continue
+        await asyncio.to_thread(self._index_road_nodes, osm_data)
+        return osm_data
 
-            amenity = tags.get("amenity", "")
-            shop = tags.get("shop", "")
+    def _collect_elements(self, osm_data: Dict, elements: List[Dict]) -> None:
+        """Add a batch of Overpass elements to the compact OSM data"""
+        for element in elements:
+            self._collect_element(osm_data, element)
 
-            if amenity == "fuel":
-                fuel.append((element["lat"], element["lon"]))
-            elif amenity == "car_repair" or shop == "car_repair":
-                repair.append((element["lat"], element["lon"]))
+    def _index_road_nodes(self, osm_data: Dict) -> None:
+        """
+        Build the spatial index used to attach origin/destination to roads
+
+        Road nodes (endpoints of at least one way segment) are indexed in a
+        KD-tree of unit-sphere vectors: chord length grows monotonically
+        with great-circle distance, so the tree's nearest neighbours are the
+        Haversine nearest ones. The tree is cached with the OSM tile.
 
-        self.fuel_stations = fuel
-        self.repair_shops = repair
+        Args:
+            osm_data: OSM data dictionary, extended in place with
+                "road_ids" and "road_tree" (None when there are no roads)
+        """
+        nodes = osm_data["nodes"]
+
+        road_nodes = set()
+        for way_nodes, _ in osm_data["ways"]:
+            for node1_id, node2_id in zip(way_nodes, way_nodes[1:]):
+                if node1_id in nodes and node2_id in nodes:
+                    road_nodes.add(node1_id)
+                    road_nodes.add(node2_id)
+
+        road_ids = [node_id for node_id in nodes if node_id in road_nodes]
+        lats = np.fromiter((nodes[n][0] for n in road_ids), np.float64, len(road_ids))
+        lons = np.fromiter((nodes[n][1] for n in road_ids), np.float64, len(road_ids))
+
+        osm_data["road_ids"] = road_ids
+        osm_data["road_tree"] = (
+            cKDTree(self._unit_vectors(lats, lons)) if road_ids else None
+        )
 
-        print(
-            f"[OverpassService] Automotive services found: "
-            f"{len(self.fuel_stations)} fuel station(s), "
-            f"{len(self.repair_shops)} repair shop(s)."
+    @staticmethod
+    def _unit_vectors(lat, lon) -> np.ndarray:
+        """Convert degrees to 3D points on the unit sphere, shape (..., 3)"""
+        lat, lon = np.radians(lat), np.radians(lon)
+        return np.stack(
+            (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)),
+            axis=-1
+        )
+
+    def _collect_element(self, osm_data: Dict, element: Dict) -> None:
+        """
+        Add one Overpass element to the compact OSM data
+
+        Args:
+            osm_data: OSM data dictionary being filled
+            element: Decoded Overpass element (node or way)
+        """
+        if element["type"] == "way":
+            osm_data["ways"].append(
+                (element.get("nodes", []), element.get("tags", {}))
+            )
+            return
+
+        if element["type"] != "node":
+            return
+
+        location = (element["lat"], element["lon"])
+        osm_data["nodes"][element["id"]] = location
+
+        tags = element.get("tags")
+        if not tags:  # bare road nodes have no tags — skip quickly
+            return
+
+        amenity = tags.get("amenity", "")
+        shop = tags.get("shop", "")
+
+        if amenity == "fuel":
+            osm_data["fuel_stations"].append(location)
+        elif amenity == "car_repair" or shop == "car_repair":
+            osm_data["repair_shops"].append(location)
+
+    @staticmethod
+    def _log_automotive_services(osm_data: Dict) -> None:
+        """Log how many automotive service POIs the OSM data holds"""
+        logger.info(
+            "Automotive services found: %s fuel station(s), %s repair shop(s).",
+            len(osm_data["fuel_stations"]), len(osm_data["repair_shops"])
         )
     
-    def extract_tags(self, way: Dict) -> Dict:
+    def extract_tags(self, tags: Dict) -> EdgeTags:
         """
         Extract relevant tags from OSM way
         
         Args:
-            way: OSM way dictionary
+            tags: Raw tags of an OSM way
             
         Returns:
-            Dictionary of extracted tags
+            EdgeTags record of extracted tags
         """
-        tags = way.get("tags", {})
+        highway = tags.get("highway", "unclassified")
+        surface = tags.get("surface")
+        smoothness = tags.get("smoothness")
         
-        return {
-            "highway": tags.get("highway", "unclassified"),
-            "surface": tags.get("surface"),
-            "smoothness": tags.get("smoothness"),
-            "tracktype": tags.get("tracktype"),
-            "lit": tags.get("lit"),
-            "traffic_signals": tags.get("traffic_signals"),
-            "maxspeed": self._parse_maxspeed(tags.get("maxspeed")),
-            "maxheight": self._parse_metric(tags.get("maxheight")),
-            "maxweight": self._parse_metric(tags.get("maxweight")),
-            "hgv": tags.get("hgv"),
-            "access": tags.get("access"),
-            "lanes": self._parse_int(tags.get("lanes")),
-            "oneway": tags.get("oneway") == "yes",
-            "name": tags.get("name", "Unnamed")
-        }
+        return EdgeTags(
+            highway=highway,
+            surface=surface,
+            smoothness=smoothness,
+            tracktype=tags.get("tracktype"),
+            lit=tags.get("lit"),
+            traffic_signals=tags.get("traffic_signals"),
+            maxspeed=self._parse_maxspeed(tags.get("maxspeed")),
+            maxheight=self._parse_metric(tags.get("maxheight")),
+            maxweight=self._parse_metric(tags.get("maxweight")),
+            hgv=tags.get("hgv"),
+            access=tags.get("access"),
+            lanes=self._parse_int(tags.get("lanes")),
+            oneway=tags.get("oneway") == "yes",
+            name=tags.get("name", "Unnamed"),
+            highway_id=intern_tag(highway, HIGHWAY_ID),
+            surface_id=intern_tag(surface, SURFACE_ID),
+            smoothness_id=intern_tag(smoothness, SMOOTHNESS_ID)
+        )
     
-    def _parse_maxspeed(self, value: Optional[str]) -> Optional[int]:
+    # Tag values repeat across thousands of ways ("50", "60 km/h", "4.2 m"),
+    # so the parsers are memoized per raw string.
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_maxspeed(value: Optional[str]) -> Optional[int]:
         """Parse maxspeed tag to integer km/h"""
         if not value:
             return None
@@ -258,7 +434,9 @@ class OverpassService:
         except (ValueError, IndexError):
             return None
     
-    def _parse_metric(self, value: Optional[str]) -> Optional[float]:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_metric(value: Optional[str]) -> Optional[float]:
         """Parse metric values like '4.2', '4.2m', '4.2 m'"""
         if not value:
             return None
@@ -270,7 +448,9 @@ class OverpassService:
         except ValueError:
             return None
     
-    def _parse_int(self, value: Optional[str]) -> Optional[int]:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_int(value: Optional[str]) -> Optional[int]:
         """Parse integer values"""
         if not value:
             return None
@@ -284,140 +464,164 @@ class OverpassService:
         self,
         osm_data: Dict,
         origin: Coordinates,
-        destination: Coordinates
-    ) -> nx.MultiDiGraph:
+        destination: Coordinates,
+        scorer: ScoringService
+    ) -> RoadGraph:
         """
-        Build NetworkX graph from OSM data
+        Build the directed road graph from OSM data
+        
+        Edge weights for every criterion are scored while the edges are
+        created, once per segment and shared by both directions.
         
         Args:
-            osm_data: Raw OSM data from Overpass
+            osm_data: Compact OSM data (see query_osm_data)
             origin: Origin coordinates
             destination: Destination coordinates
+            scorer: Scoring service, with automotive services already set
             
         Returns:
-            NetworkX MultiDiGraph with road network
+            RoadGraph with the road network, origin and destination
+            connected to their nearest road nodes. Weights cover each of
+            ScoringService.CRITERIA (vehicle restrictions excluded).
         """
-        G = nx.MultiDiGraph()
+        # Node lookup: id -> (lat, lon)
+        nodes = osm_data["nodes"]
+        edge_tags = [self.extract_tags(way_tags) for _, way_tags in osm_data["ways"]]
         
-        # Build node lookup
-        nodes = {}
-        for element in osm_data.get("elements", []):
-            if element["type"] == "node":
-                nodes[element["id"]] = {
-                    "lat": element["lat"],
-                    "lon": element["lon"]
-                }
+        # Node indices: origin and destination first, then road nodes in
+        # order of appearance
+        index = {"origin": RoadGraph.ORIGIN, "destination": RoadGraph.DESTINATION}
         
-        # Add origin and destination as special nodes
-        origin_id = "origin"
-        dest_id = "destination"
+        # Collect consecutive node pairs of every way first, so that all
+        # segment lengths can be computed in one vectorized Haversine pass.
+        seg_u, seg_v, seg_tags = [], [], []
+        for tag_id, (way_nodes, _) in enumerate(osm_data["ways"]):
+            for node1_id, node2_id in zip(way_nodes, way_nodes[1:]):
+                if node1_id not in nodes or node2_id not in nodes:
+                    continue
+                seg_u.append(index.setdefault(node1_id, len(index)))
+                seg_v.append(index.setdefault(node2_id, len(index)))
+                seg_tags.append(tag_id)
         
-        G.add_node(origin_id, lat=origin.lat, lon=origin.lon, is_origin=True)
-        G.add_node(dest_id, lat=destination.lat, lon=destination.lon, is_destination=True)
+        node_ids = list(index)
+        lats = np.empty(len(node_ids), dtype=np.float64)
+        lons = np.empty(len(node_ids), dtype=np.float64)
+        lats[:2] = origin.lat, destination.lat
+        lons[:2] = origin.lon, destination.lon
+        lats[2:] = np.fromiter((nodes[n][0] for n in node_ids[2:]), np.float64, len(node_ids) - 2)
+        lons[2:] = np.fromiter((nodes[n][1] for n in node_ids[2:]), np.float64, len(node_ids) - 2)
         
-        # Add ways as edges
-        for element in osm_data.get("elements", []):
-            if element["type"] == "way":
-                way_nodes = element.get("nodes", [])
-                tags = self.extract_tags(element)
-                
-                # Create edges between consecutive nodes
-                for i in range(len(way_nodes) - 1):
-                    node1_id = way_nodes[i]
-                    node2_id = way_nodes[i + 1]
-                    
-                    if node1_id not in nodes or node2_id not in nodes:
-                        continue
-                    
-                    node1 = nodes[node1_id]
-                    node2 = nodes[node2_id]
-                    
-                    # Add nodes to graph
-                    G.add_node(node1_id, **node1)
-                    G.add_node(node2_id, **node2)
-                    
-                    # Calculate edge length (Haversine distance)
-                    distance = self._haversine_distance(
-                        node1["lat"], node1["lon"],
-                        node2["lat"], node2["lon"]
-                    )
-                    
-                    # Add edge with tags.
-                    # seg_lat / seg_lon store the midpoint of the segment so that
-                    # ScoringService can check proximity to automotive services
-                    # without needing to carry full node geometry.
-                    edge_data = {
-                        "distance": distance,
-                        "seg_lat": (node1["lat"] + node2["lat"]) / 2.0,
-                        "seg_lon": (node1["lon"] + node2["lon"]) / 2.0,
-                        **tags
-                    }
-                    
-                    G.add_edge(node1_id, node2_id, **edge_data)
-                    
-                    # Add reverse edge if not oneway
-                    if not tags["oneway"]:
-                        G.add_edge(node2_id, node1_id, **edge_data)
+        seg_u = np.array(seg_u, dtype=np.int32)
+        seg_v = np.array(seg_v, dtype=np.int32)
+        seg_tags = np.array(seg_tags, dtype=np.int64)
         
-        # Connect origin and destination to nearest nodes
-        self._connect_terminal_nodes(G, origin_id, nodes)
-        self._connect_terminal_nodes(G, dest_id, nodes)
+        distances = haversine_km(lats[seg_u], lons[seg_u], lats[seg_v], lons[seg_v])
+        # Segment midpoints let ScoringService check proximity to
+        # automotive services without needing full node geometry.
+        seg_lats = (lats[seg_u] + lats[seg_v]) / 2.0
+        seg_lons = (lons[seg_u] + lons[seg_v]) / 2.0
         
-        return G
-    
-    def _connect_terminal_nodes(
-        self,
-        G: nx.MultiDiGraph,
-        terminal_id: str,
-        nodes: Dict
-    ):
-        """Connect origin/destination to nearest road nodes"""
-        terminal_data = G.nodes[terminal_id]
-        terminal_lat = terminal_data["lat"]
-        terminal_lon = terminal_data["lon"]
+        criteria = scorer.CRITERIA
+        way_columns = self._tag_columns(edge_tags)
+        seg_weights = scorer.compute_weights(
+            distances, seg_lats, seg_lons, seg_tags, way_columns, criteria
+        )
         
-        # Find nearest nodes
-        nearest_nodes = []
-        for node_id, node_data in nodes.items():
-            if node_id not in G:
-                continue
-            
-            dist = self._haversine_distance(
-                terminal_lat, terminal_lon,
-                node_data["lat"], node_data["lon"]
+        # Directed edges: every segment forward, immediately followed by
+        # its reverse unless the way is oneway
+        oneway = np.fromiter((tags.oneway for tags in edge_tags), bool, len(edge_tags))
+        segment = np.repeat(np.arange(len(seg_tags)), np.where(oneway[seg_tags], 1, 2))
+        reverse = np.zeros(len(segment), dtype=bool)
+        reverse[1:] = segment[1:] == segment[:-1]
+        
+        rows = np.where(reverse, seg_v[segment], seg_u[segment])
+        cols = np.where(reverse, seg_u[segment], seg_v[segment])
+        
+        # Connect origin and destination to their nearest road nodes with
+        # bidirectional connector edges weighted by plain distance
+        conn_rows, conn_cols, conn_dists = [], [], []
+        for terminal in (RoadGraph.ORIGIN, RoadGraph.DESTINATION):
+            nearest, dists = self._nearest_road_nodes(
+                lats[terminal], lons[terminal], nodes,
+                osm_data["road_ids"], osm_data["road_tree"]
             )
-            nearest_nodes.append((node_id, dist))
+            for node_id, dist in zip(nearest, dists.tolist()):
+                conn_rows += [terminal, index[node_id]]
+                conn_cols += [index[node_id], terminal]
+                conn_dists += [dist, dist]
         
-        # Connect to 5 nearest nodes
-        nearest_nodes.sort(key=lambda x: x[1])
-        for node_id, dist in nearest_nodes[:5]:
-            # Add bidirectional edges
-            G.add_edge(terminal_id, node_id, distance=dist, connector=True)
-            G.add_edge(node_id, terminal_id, distance=dist, connector=True)
+        conn_dists = np.array(conn_dists, dtype=np.float64)
+        nan = np.full(len(conn_dists), np.nan)
+        
+        return RoadGraph(
+            node_ids=node_ids,
+            lats=lats,
+            lons=lons,
+            rows=np.concatenate((rows, conn_rows)).astype(np.int32),
+            cols=np.concatenate((cols, conn_cols)).astype(np.int32),
+            distances=np.concatenate((distances[segment], conn_dists)),
+            seg_lats=np.concatenate((seg_lats[segment], nan)),
+            seg_lons=np.concatenate((seg_lons[segment], nan)),
+            tag_ids=np.concatenate((seg_tags[segment], np.full(len(conn_dists), -1))),
+            weights=np.concatenate((
+                seg_weights[segment],
+                np.repeat(conn_dists[:, None], len(criteria), axis=1)
+            )),
+            edge_tags=edge_tags,
+            way_columns=way_columns
+        )
     
-    def _haversine_distance(
-        self,
-        lat1: float,
-        lon1: float,
-        lat2: float,
-        lon2: float
-    ) -> float:
+    @staticmethod
+    def _tag_columns(edge_tags: List[EdgeTags]) -> Dict[str, np.ndarray]:
         """
-        Calculate distance between two points using Haversine formula
+        Gather the scored and alert-relevant tags of every way into columns
         
         Returns:
-            Distance in kilometers
+            Dictionary of arrays indexed by tag_id (interned IDs, speed
+            limit and dimensions with 0 = absent), as consumed by
+            ScoringService.compute_weights and generate_alerts_batch
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        R = 6371  # Earth radius in km
+        def column(values, dtype) -> np.ndarray:
+            return np.fromiter(values, dtype, len(edge_tags))
         
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+        return {
+            "highway_id": column((tags.highway_id for tags in edge_tags), np.intp),
+            "surface_id": column((tags.surface_id for tags in edge_tags), np.intp),
+            "smoothness_id": column((tags.smoothness_id for tags in edge_tags), np.intp),
+            "hgv_id": column((intern_tag(tags.hgv, HGV_ID) for tags in edge_tags), np.intp),
+            "access_id": column((intern_tag(tags.access, ACCESS_ID) for tags in edge_tags), np.intp),
+            "maxspeed": column((tags.maxspeed or 0 for tags in edge_tags), np.int32),
+            "maxheight": column((tags.maxheight or 0.0 for tags in edge_tags), np.float64),
+            "maxweight": column((tags.maxweight or 0.0 for tags in edge_tags), np.float64)
+        }
+    
+    def _nearest_road_nodes(
+        self,
+        lat: float,
+        lon: float,
+        nodes: Dict,
+        road_ids: List[int],
+        road_tree: Optional[cKDTree],
+        k: int = 5
+    ) -> Tuple[List[int], np.ndarray]:
+        """
+        Find the k road nodes nearest to a point
         
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        Returns:
+            Node ids sorted by distance, and their distances in km
+        """
+        if road_tree is None:
+            return [], np.empty(0)
         
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
+        # O(log n) lookup of the k nearest road nodes (sorted by distance)
+        _, nearest = road_tree.query(
+            self._unit_vectors(lat, lon), k=min(k, len(road_ids))
+        )
+        node_ids = [road_ids[i] for i in np.atleast_1d(nearest)]
         
-        return R * c
+        dists = haversine_km(
+            lat, lon,
+            np.array([nodes[n][0] for n in node_ids]),
+            np.array([nodes[n][1] for n in node_ids])
+        )
+        return node_ids, dists
@@ -1,24 +1,47 @@
 """
 OpenRoute Navigator - Routing Service
 
-Core routing engine using NetworkX for multi-criteria pathfinding
+Core routing engine: the OSM road graph is flattened into a sparse
+CSR matrix and searched with SciPy's compiled Dijkstra for each criterion
 """
 
-import networkx as nx
-from typing import List, Dict, Optional, Tuple
+import asyncio
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from typing import List, Dict, Optional, Tuple, NamedTuple
+from app.models.road_graph import RoadGraph
 from app.models.schemas import Route, Alert, VehicleParams, Coordinates
 from app.services.overpass import OverpassService
 from app.services.scoring import ScoringService
+from app.utils.geo import haversine_km
+
+
+logger = logging.getLogger(__name__)
+
+
+class CsrTopology(NamedTuple):
+    """Sparse matrix structure of a road graph, shared by every criterion"""
+    order: np.ndarray     # edge positions sorted by (row, col)
+    entries: np.ndarray   # offset in order of each distinct (row, col) pair
+    indptr: np.ndarray    # CSR row pointers, one entry per distinct pair
+    indices: np.ndarray   # CSR column indices, one entry per distinct pair
 
 
 class RoutingService:
     """Service for calculating routes with different optimization criteria"""
     
+    # Dijkstra is first bounded to this multiple of the lower-bound path
+    # cost (straight-line distance x cheapest weight per km). Road detours
+    # and penalties rarely exceed it; otherwise the search is rerun unbounded.
+    SEARCH_LIMIT_FACTOR = 3.0
+    
     def __init__(self):
         self.overpass = OverpassService()
-        self.scorer = ScoringService()
     
-    def calculate_routes(
+    async def calculate_routes(
         self,
         origin: Coordinates,
         destination: Coordinates,
@@ -35,23 +58,53 @@ class RoutingService:
         Returns:
             List of Route objects
         """
-        # Query OSM data (also populates overpass.fuel_stations / repair_shops)
+        # Query OSM data (roads and automotive service POIs)
         bbox = self.overpass.calculate_bbox(origin, destination)
-        osm_data = self.overpass.query_osm_data(bbox)
-
-        # Share automotive service locations with the scorer so that
-        # the safety criterion uses infrastructure proximity data.
-        self.scorer.set_automotive_services(
-            fuel_stations=self.overpass.fuel_stations,
-            repair_shops=self.overpass.repair_shops
+        osm_data = await self.overpass.query_osm_data(bbox)
+        
+        # Graph construction and searches are CPU-bound: run them in a worker
+        # thread so the event loop keeps serving other requests' I/O
+        return await asyncio.to_thread(
+            self._compute_routes, osm_data, origin, destination, vehicle
+        )
+    
+    def _compute_routes(
+        self,
+        osm_data: Dict,
+        origin: Coordinates,
+        destination: Coordinates,
+        vehicle: Optional[VehicleParams]
+    ) -> List[Route]:
+        """
+        Build the road graph and search it for every criterion
+        
+        Args:
+            osm_data: Compact OSM data for the request's bounding box
+            origin: Origin coordinates
+            destination: Destination coordinates
+            vehicle: Vehicle parameters
+            
+        Returns:
+            List of Route objects
+        """
+        # Share automotive service locations with the scorer so that the
+        # safety criterion uses infrastructure proximity data. Each request
+        # gets its own scorer, so concurrent requests never swap its indices.
+        scorer = ScoringService()
+        scorer.set_automotive_services(
+            fuel_stations=osm_data["fuel_stations"],
+            repair_shops=osm_data["repair_shops"]
         )
         
-        # Build graph
-        G = self.overpass.build_graph(osm_data, origin, destination)
+        # Build graph (edges come with their weights for every criterion)
+        graph = self.overpass.build_graph(osm_data, origin, destination, scorer)
         
-        if not G.has_node("origin") or not G.has_node("destination"):
+        if not (graph.tag_ids < 0).any():
             raise Exception("Failed to connect origin or destination to road network")
         
+        # Sparse matrix structure, built once for all criteria
+        topology = self._csr_topology(graph)
+        
         # Calculate routes for different criteria
         routes = []
         
@@ -61,19 +114,32 @@ class RoutingService:
         if vehicle and vehicle.vehicle_type == "truck":
             criteria.append("truck_compatible")
         
-        for criterion in criteria:
-            try:
-                route = self._calculate_single_route(
-                    G, criterion, vehicle, origin, destination
+        # One weight array per criterion over the shared graph topology,
+        # taken from the weights scored during graph construction (vehicle
+        # restrictions applied), with the mask of blocked edges
+        weights = [scorer.precompute(graph, criterion, vehicle) for criterion in criteria]
+        
+        # Search all criteria concurrently (SciPy's Dijkstra runs in C)
+        with ThreadPoolExecutor(max_workers=len(criteria)) as pool:
+            futures = [
+                pool.submit(
+                    self._calculate_single_route,
+                    graph, topology, scorer, weights[i], criterion, vehicle,
+                    origin, destination
                 )
+                for i, criterion in enumerate(criteria)
+            ]
+        
+        for criterion, future in zip(criteria, futures):
+            try:
+                route = future.result()
                 if route:
                     routes.append(route)
-            except nx.NetworkXNoPath:
-                # No path found for this criterion (e.g., no truck-compatible route)
-                print(f"No path found for criterion: {criterion}")
-                continue
+                else:
+                    # No path found for this criterion (e.g., no truck-compatible route)
+                    logger.info("No path found for criterion: %s", criterion)
             except Exception as e:
-                print(f"Error calculating {criterion} route: {e}")
+                logger.error("Error calculating %s route: %s", criterion, e)
                 continue
         
         if not routes:
@@ -81,9 +147,45 @@ class RoutingService:
         
         return routes
     
+    def _csr_topology(self, graph: RoadGraph) -> CsrTopology:
+        """
+        Compute the CSR matrix structure of the graph's edges
+        
+        Args:
+            graph: Road graph
+            
+        Returns:
+            CsrTopology with the sorted edge order and CSR index arrays
+        """
+        n = graph.num_nodes
+        rows, cols = graph.rows, graph.cols
+        
+        # CSR topology shared by every criterion: parallel edges collapse
+        # into one matrix entry, only the data array differs per criterion.
+        # The stable sort keeps parallel edges in insertion order.
+        keys = rows.astype(np.int64) * n + cols
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        entries = np.flatnonzero(
+            np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        )
+        
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[order[entries]], minlength=n), out=indptr[1:])
+        
+        return CsrTopology(
+            order=order,
+            entries=entries,
+            indptr=indptr,
+            indices=cols[order[entries]]
+        )
+    
     def _calculate_single_route(
         self,
-        G: nx.MultiDiGraph,
+        graph: RoadGraph,
+        topology: CsrTopology,
+        scorer: ScoringService,
+        weights: Tuple[np.ndarray, np.ndarray],
         criterion: str,
         vehicle: Optional[VehicleParams],
         origin: Coordinates,
@@ -93,7 +195,11 @@ class RoutingService:
         Calculate a single route for a specific criterion
         
         Args:
-            G: NetworkX graph
+            graph: Road graph
+            topology: CSR structure of graph
+            scorer: Scoring service of this request
+            weights: Edge weights for this criterion and blocked edge mask,
+                aligned with graph edges (see ScoringService.precompute)
             criterion: Routing criterion
             vehicle: Vehicle parameters
             origin: Origin coordinates
@@ -102,62 +208,41 @@ class RoutingService:
         Returns:
             Route object or None if no path found
         """
-        # Create weighted graph for this criterion
-        weighted_graph = self._create_weighted_graph(G, criterion, vehicle)
-        
-        # Find shortest path
-        try:
-            path = nx.shortest_path(
-                weighted_graph,
-                source="origin",
-                target="destination",
-                weight="weight"
-            )
-        except nx.NetworkXNoPath:
+        # Admissible lower bound on the path cost, used to stop Dijkstra
+        # from expanding the whole graph around the origin
+        straight_km = haversine_km(
+            origin.lat, origin.lon, destination.lat, destination.lon
+        )
+        
+        # Find shortest path (as a sequence of edge positions)
+        edge_weights, blocked = weights
+        path_edges = self._shortest_path(
+            graph,
+            topology,
+            edge_weights,
+            blocked,
+            source=RoadGraph.ORIGIN,
+            target=RoadGraph.DESTINATION,
+            straight_km=float(straight_km)
+        )
+        if path_edges is None:
             return None
         
-        # Calculate route metrics
-        total_distance = 0.0
-        geometry = []
-        all_alerts = []
+        # Route geometry: the source node of every path edge, then the
+        # destination, gathered as [lon, lat] pairs in one shot
+        path = np.asarray(path_edges, dtype=np.int64)
+        path_nodes = np.append(graph.rows[path], RoadGraph.DESTINATION)
+        geometry = np.column_stack(
+            (graph.lons[path_nodes], graph.lats[path_nodes])
+        ).tolist()
         
-        for i in range(len(path) - 1):
-            node1 = path[i]
-            node2 = path[i + 1]
-            
-            # Get node coordinates
-            node1_data = G.nodes[node1]
-            node2_data = G.nodes[node2]
-            
-            # Add to geometry
-            geometry.append([node1_data["lon"], node1_data["lat"]])
-            
-            # Get edge data (use first edge if multiple)
-            edge_data = G.get_edge_data(node1, node2)
-            if isinstance(edge_data, dict):
-                # MultiDiGraph returns dict of dicts
-                edge_data = list(edge_data.values())[0]
-            
-            # Accumulate distance
-            distance = edge_data.get("distance", 0)
-            total_distance += distance
-            
-            # Generate alerts for this edge
-            if not edge_data.get("connector"):
-                edge_alerts = self.scorer.generate_alerts_for_edge(
-                    edge_data,
-                    vehicle,
-                    node2_data["lat"],
-                    node2_data["lon"]
-                )
-                all_alerts.extend(edge_alerts)
+        total_distance = float(graph.distances[path].sum())
         
-        # Add final destination to geometry
-        dest_data = G.nodes["destination"]
-        geometry.append([dest_data["lon"], dest_data["lat"]])
+        # Generate alerts for the road edges, located at their target nodes
+        all_alerts, levels = scorer.generate_alerts_batch(graph, path, vehicle)
         
         # Deduplicate alerts by message
-        unique_alerts = self._deduplicate_alerts(all_alerts)
+        unique_alerts, unique_levels = self._deduplicate_alerts(all_alerts, levels)
         
         # Map criterion to route type
         route_type_map = {
@@ -168,9 +253,10 @@ class RoutingService:
         }
         
         # Create summary
-        summary = self.scorer.summarize_alerts(unique_alerts)
+        summary = scorer.summarize_alerts(unique_alerts, unique_levels)
         
-        return Route(
+        # Geometry and alerts are produced here, no need to revalidate them
+        return Route.model_construct(
             type=route_type_map[criterion],
             distance_km=round(total_distance, 2),
             geometry=geometry,
@@ -178,61 +264,118 @@ class RoutingService:
             summary=summary
         )
     
-    def _create_weighted_graph(
+    def _shortest_path(
         self,
-        G: nx.MultiDiGraph,
-        criterion: str,
-        vehicle: Optional[VehicleParams]
-    ) -> nx.DiGraph:
+        graph: RoadGraph,
+        topology: CsrTopology,
+        weights: np.ndarray,
+        blocked: np.ndarray,
+        source: int,
+        target: int,
+        straight_km: float = 0.0
+    ) -> Optional[List[int]]:
         """
-        Create a weighted graph based on criterion
+        Run Dijkstra on the shared CSR topology with this criterion's weights
+        
+        The search is first bounded to SEARCH_LIMIT_FACTOR times a lower
+        bound of the path cost: every edge costs at least its length times
+        the smallest weight/length ratio in the graph, and no path is
+        shorter than the straight line. If the target lies within that
+        radius the result is exact; otherwise the search is rerun unbounded.
         
         Args:
-            G: Original MultiDiGraph
-            criterion: Routing criterion
-            vehicle: Vehicle parameters
+            graph: Road graph
+            topology: CSR structure of graph
+            weights: Weight of each edge (inf = blocked)
+            blocked: Mask of the blocked edges
+            source: Matrix index of the source node
+            target: Matrix index of the target node
+            straight_km: Straight-line distance between source and target
             
         Returns:
-            Weighted DiGraph
+            Edge positions along the shortest path, or None if unreachable
         """
-        weighted = nx.DiGraph()
+        n = graph.num_nodes
         
-        # Copy nodes
-        for node, data in G.nodes(data=True):
-            weighted.add_node(node, **data)
+        # Coalesce parallel edges: each matrix entry takes the cheapest of
+        # its edges for this criterion (the first one on ties). Entries whose
+        # edges are all blocked keep an inf weight, which Dijkstra never relaxes.
+        sorted_weights = weights[topology.order]
+        data = np.minimum.reduceat(sorted_weights, topology.entries)
+        group_sizes = np.diff(np.r_[topology.entries, len(topology.order)])
+        is_min = sorted_weights == np.repeat(data, group_sizes)
+        candidates = np.where(is_min, np.arange(len(topology.order)), len(topology.order))
+        kept = topology.order[np.minimum.reduceat(candidates, topology.entries)]
         
-        # Add weighted edges
-        for u, v, data in G.edges(data=True):
-            weight = self.scorer.calculate_edge_weight(data, criterion, vehicle)
-            
-            # Skip infinite weight edges (blocked roads)
-            if weight == float('inf'):
-                continue
-            
-            # Add edge with calculated weight
-            weighted.add_edge(u, v, weight=weight, **data)
+        matrix = csr_matrix((data, topology.indices, topology.indptr), shape=(n, n))
+        
+        limit = np.inf
+        lengths = graph.distances[kept]
+        positive = (lengths > 0) & ~blocked[kept]
+        if straight_km > 0 and positive.any():
+            min_ratio = np.min(data[positive] / lengths[positive])
+            limit = self.SEARCH_LIMIT_FACTOR * straight_km * min_ratio
         
-        return weighted
+        _, predecessors = dijkstra(
+            matrix, indices=source, return_predecessors=True, limit=limit
+        )
+        if predecessors[target] < 0 and limit != np.inf:
+            _, predecessors = dijkstra(
+                matrix, indices=source, return_predecessors=True
+            )
+        
+        if predecessors[target] < 0:
+            return None
+        
+        # Walk predecessors back from the target, locating each CSR entry
+        path_edges = []
+        node = target
+        while node != source:
+            prev = predecessors[node]
+            start, end = topology.indptr[prev], topology.indptr[prev + 1]
+            entry = start + np.searchsorted(topology.indices[start:end], node)
+            path_edges.append(int(kept[entry]))
+            node = prev
+        
+        path_edges.reverse()
+        return path_edges
     
-    def _deduplicate_alerts(self, alerts: List[Alert]) -> List[Alert]:
+    def _deduplicate_alerts(
+        self,
+        alerts: List[Alert],
+        levels: Optional[np.ndarray] = None
+    ) -> Tuple[List[Alert], np.ndarray]:
         """
         Remove duplicate alerts based on message
         
         Args:
             alerts: List of alerts
+            levels: Level code of each alert (see ScoringService.ALERT_LEVELS),
+                derived from the alerts when omitted
             
         Returns:
-            Deduplicated list of alerts
+            Deduplicated list of alerts and their level codes
         """
+        if levels is None:
+            levels = np.fromiter(
+                (ScoringService.ALERT_LEVELS.index(a.level) for a in alerts),
+                np.int8, len(alerts)
+            )
+        
         seen_messages = set()
         unique_alerts = []
+        picked = []
         
-        # Prioritize red alerts
-        sorted_alerts = sorted(alerts, key=lambda a: {"red": 0, "yellow": 1, "green": 2}[a.level])
-        
-        for alert in sorted_alerts:
-            if alert.message not in seen_messages:
-                seen_messages.add(alert.message)
-                unique_alerts.append(alert)
+        # Prioritize red alerts: one pass per level instead of a full sort,
+        # stopping as soon as the 10 most important alerts are collected
+        for code in reversed(range(len(ScoringService.ALERT_LEVELS))):
+            for i in np.flatnonzero(levels == code).tolist():
+                alert = alerts[i]
+                if alert.message not in seen_messages:
+                    seen_messages.add(alert.message)
+                    unique_alerts.append(alert)
+                    picked.append(i)
+                    if len(unique_alerts) == 10:
+                        return unique_alerts, levels[picked]
         
-        return unique_alerts[:10]  # Limit to 10 most important alerts
+        return unique_alerts, levels[picked]
@@ -8,32 +8,93 @@ from typing import Dict, List, Optional, Tuple
 from math import radians
 import numpy as np
 from scipy.spatial import KDTree
+
+try:
+    import numba
+except ImportError:  # numba is optional: fall back to plain NumPy
+    numba = None
+
+from app.models.edge_tags import EdgeTags
+from app.models.road_graph import RoadGraph
 from app.models.schemas import Alert, VehicleParams, Coordinates
 from app.utils.osm_weights import (
-    HIGHWAY_WEIGHTS,
-    SURFACE_WEIGHTS,
-    SMOOTHNESS_WEIGHTS,
     TRACKTYPE_WEIGHTS,
     SERVICE_PROXIMITY_FACTORS,
     TRUCK_RESTRICTIONS,
-    DEFAULTS,
     CRITERIA_MULTIPLIERS,
-    get_speed_penalty
+    CRITERIA_MULT_ARR,
+    MULTIPLIER_KEYS,
+    HIGHWAY_TABLE,
+    SURFACE_TABLE,
+    SMOOTHNESS_TABLE,
+    HGV_ID,
+    SURFACE_RED_IDS,
+    SURFACE_YELLOW_IDS,
+    SMOOTHNESS_RED_IDS,
+    SMOOTHNESS_YELLOW_IDS,
+    DENIED_ACCESS_IDS,
+    LIMITED_ACCESS_IDS
 )
 
 
+if numba is not None:
+    @numba.njit(cache=True)
+    def _edge_weights_kernel(
+        distances, highway_ids, surface_ids, smoothness_ids, safety_weight,
+        multipliers, highway_table, surface_table, smoothness_table
+    ):
+        """
+        Fused compute_weights arithmetic: one pass over the segments
+        
+        Same operations, in the same order, as the NumPy expression, so
+        results are identical; no temporary array per factor is created.
+        """
+        weights = np.empty((distances.shape[0], multipliers.shape[0]))
+        for i in range(distances.shape[0]):
+            highway_weight = highway_table[highway_ids[i]] - 1.0
+            surface_weight = surface_table[surface_ids[i]] - 1.0
+            smoothness_weight = smoothness_table[smoothness_ids[i]] - 1.0
+            for c in range(multipliers.shape[0]):
+                weights[i, c] = (
+                    distances[i] * multipliers[c, 0] *
+                    (1 + highway_weight * multipliers[c, 1]) *
+                    (1 + surface_weight * multipliers[c, 2]) *
+                    (1 + smoothness_weight * multipliers[c, 3]) *
+                    (1 + safety_weight[i] * multipliers[c, 4])
+                )
+        return weights
+
+
+def warm_up() -> None:
+    """Compile (or load the cached) numba weight kernel ahead of the first request"""
+    if numba is not None:
+        ids = np.zeros(1, dtype=np.intp)
+        _edge_weights_kernel(
+            np.zeros(1), ids, ids, ids, np.zeros(1),
+            np.ones((1, len(MULTIPLIER_KEYS))), HIGHWAY_TABLE, SURFACE_TABLE, SMOOTHNESS_TABLE
+        )
+
+
 class ScoringService:
     """
     Service for calculating edge weights and generating alerts.
     
     To use automotive-service-based safety scoring, supply the lists of
     fuel station and repair shop coordinates (from OverpassService) via
-    set_automotive_services() before calling calculate_edge_weight().
+    set_automotive_services() before calling compute_weights().
     """
 
     # Proximity radius (km) within which a service is considered "nearby"
     SERVICE_RADIUS_KM: float = 0.5
 
+    # Criteria whose weights are precomputed on every graph edge, one
+    # column each of RoadGraph.weights (in this order)
+    CRITERIA: Tuple[str, ...] = tuple(CRITERIA_MULTIPLIERS)
+
+    # Alert levels by severity; the index is the level code used in the
+    # int8 level arrays returned alongside alert lists
+    ALERT_LEVELS: Tuple[str, ...] = ("green", "yellow", "red")
+
     def __init__(self) -> None:
         # Raw coordinate lists — stored so callers can inspect them if needed
         self._fuel_stations: List[Tuple[float, float]] = []
@@ -74,88 +135,156 @@ class ScoringService:
         self._fuel_tree = self._build_kdtree(fuel_stations)
         self._repair_tree = self._build_kdtree(repair_shops)
     
-    def calculate_edge_weight(
+    def compute_weights(
+        self,
+        distances: np.ndarray,
+        seg_lats: np.ndarray,
+        seg_lons: np.ndarray,
+        tag_ids: np.ndarray,
+        way_columns: Dict[str, np.ndarray],
+        criteria: List[str]
+    ) -> np.ndarray:
+        """
+        Calculate the weights of a whole batch of road segments at once
+        
+        The tag-based components are looked up per way in the
+        integer-indexed weight tables and gathered per segment, the
+        service proximity is queried for all midpoints in a single KDTree
+        call, and each criterion column is one NumPy expression (fused
+        into a single numba kernel when numba is installed).
+        
+        Args:
+            distances: Length of each segment in km
+            seg_lats: Latitude of each segment midpoint
+            seg_lons: Longitude of each segment midpoint
+            tag_ids: Way tag index of each segment
+            way_columns: Interned tag IDs of each way ("highway_id",
+                "surface_id", "smoothness_id"), indexed by tag_ids
+            criteria: Routing criteria to score the segments for
+            
+        Returns:
+            (segments, criteria) weight matrix (vehicle restrictions excluded)
+        """
+        safety_weight = self._get_safety_weights(seg_lats, seg_lons)
+        
+        multipliers = np.array(
+            [self._multipliers(criterion) for criterion in criteria], dtype=np.float64
+        ).reshape(len(criteria), len(MULTIPLIER_KEYS))
+        
+        if numba is not None:
+            return _edge_weights_kernel(
+                distances,
+                way_columns["highway_id"][tag_ids],
+                way_columns["surface_id"][tag_ids],
+                way_columns["smoothness_id"][tag_ids],
+                safety_weight,
+                multipliers,
+                HIGHWAY_TABLE,
+                SURFACE_TABLE,
+                SMOOTHNESS_TABLE
+            )
+        
+        highway_weight = (HIGHWAY_TABLE[way_columns["highway_id"]] - 1.0)[tag_ids]
+        surface_weight = (SURFACE_TABLE[way_columns["surface_id"]] - 1.0)[tag_ids]
+        smoothness_weight = (SMOOTHNESS_TABLE[way_columns["smoothness_id"]] - 1.0)[tag_ids]
+        
+        weights = np.empty((len(distances), len(criteria)), dtype=np.float64)
+        for column, (m_d, m_h, m_s, m_sm, m_sa) in enumerate(multipliers):
+            weights[:, column] = (
+                distances * m_d *
+                (1 + highway_weight * m_h) *
+                (1 + surface_weight * m_s) *
+                (1 + smoothness_weight * m_sm) *
+                (1 + safety_weight * m_sa)
+            )
+        
+        return weights
+    
+    @staticmethod
+    def _multipliers(criterion: str) -> np.ndarray:
+        """Multipliers of a criterion in MULTIPLIER_KEYS order (unknown = fastest)"""
+        return CRITERIA_MULT_ARR.get(criterion, CRITERIA_MULT_ARR["fastest"])
+    
+    def precompute(
         self,
-        edge_data: Dict,
+        graph: RoadGraph,
         criterion: str,
         vehicle: Optional[VehicleParams] = None
-    ) -> float:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate edge weight based on criterion
+        Final weight of every graph edge for one criterion
+        
+        Takes the criterion's column of graph.weights and, for
+        truck_compatible, applies the vehicle's restriction penalties.
+        Results are cached on the graph, keyed by the criterion and the
+        vehicle attributes that affect it. Graphs are currently built per
+        request and each criterion is precomputed once, so the cache only
+        pays off once graphs are reused across requests; until then it
+        just holds each result for the graph's lifetime.
         
         Args:
-            edge_data: Edge data dictionary with OSM tags
-            criterion: Routing criterion (fastest, best_surface, safest, truck_compatible)
+            graph: Road graph with precomputed weights
+            criterion: Routing criterion (one of CRITERIA)
             vehicle: Vehicle parameters
             
         Returns:
-            Edge weight (lower is better)
+            Weight of each edge (inf = blocked) and the blocked edge mask
         """
-        # Get base distance
-        distance = edge_data.get("distance", 1.0)
-        
-        # Skip connector edges (origin/destination connectors)
-        if edge_data.get("connector"):
-            return distance
-        
-        # Get criterion multipliers
-        multipliers = CRITERIA_MULTIPLIERS.get(criterion, CRITERIA_MULTIPLIERS["fastest"])
-        
-        # Calculate component weights
-        highway_weight = self._get_highway_weight(edge_data)
-        surface_weight = self._get_surface_weight(edge_data)
-        smoothness_weight = self._get_smoothness_weight(edge_data)
-        safety_weight = self._get_safety_weight(edge_data)
-        
-        # Combine weights based on criterion
-        total_weight = (
-            distance * multipliers["distance"] *
-            (1 + highway_weight * multipliers["highway_type"]) *
-            (1 + surface_weight * multipliers["surface"]) *
-            (1 + smoothness_weight * multipliers["smoothness"]) *
-            (1 + safety_weight * multipliers["safety"])
-        )
+        truck = criterion == "truck_compatible" and vehicle is not None
+        if truck:
+            key = (criterion, vehicle.vehicle_type, vehicle.height, vehicle.weight)
+        else:
+            key = (criterion,)
         
-        # Apply truck restrictions if applicable
-        if criterion == "truck_compatible" and vehicle:
-            restriction_penalty = self._get_truck_restriction_penalty(edge_data, vehicle)
-            if restriction_penalty == float('inf'):
-                return float('inf')  # Blocked edge
-            total_weight *= restriction_penalty
+        cached = graph.weight_cache.get(key)
+        if cached is not None:
+            return cached
         
-        return total_weight
-    
-    def _get_highway_weight(self, edge_data: Dict) -> float:
-        """Get highway type weight"""
-        highway = edge_data.get("highway", DEFAULTS["highway"])
-        return HIGHWAY_WEIGHTS.get(highway, HIGHWAY_WEIGHTS["default"]) - 1.0
-    
-    def _get_surface_weight(self, edge_data: Dict) -> float:
-        """Get surface quality weight"""
-        surface = edge_data.get("surface")
-        if not surface:
-            return 0.0
-        
-        weight = SURFACE_WEIGHTS.get(surface, SURFACE_WEIGHTS["default"])
-        return weight - 1.0
+        weights = graph.weights[:, self.CRITERIA.index(criterion)]
+        blocked = np.zeros(len(weights), dtype=bool)
+        
+        # Vehicle restrictions apply per way, multiplicatively (inf =
+        # blocked, also for zero-length edges); connectors are unrestricted
+        if truck:
+            way_penalties = self.get_truck_restriction_penalties(graph.edge_tags, vehicle)
+            penalties = np.where(graph.tag_ids >= 0, way_penalties[graph.tag_ids], 1.0)
+            blocked = np.isinf(penalties)
+            weights = np.where(blocked, np.inf, weights * penalties)
+        
+        graph.weight_cache[key] = weights, blocked
+        return weights, blocked
     
-    def _get_smoothness_weight(self, edge_data: Dict) -> float:
-        """Get smoothness weight"""
-        smoothness = edge_data.get("smoothness")
-        if not smoothness:
-            return 0.0
-        
-        weight = SMOOTHNESS_WEIGHTS.get(smoothness, SMOOTHNESS_WEIGHTS["default"])
-        return weight - 1.0
+    def get_truck_restriction_penalties(
+        self,
+        edge_tags: List[EdgeTags],
+        vehicle: VehicleParams
+    ) -> np.ndarray:
+        """
+        Truck restriction penalty of every way for a given vehicle
+        
+        Precomputed truck_compatible weights leave the vehicle out, so the
+        penalties are applied to them multiplicatively at query time.
+        
+        Args:
+            edge_tags: Way tags, indexed by the edges' tag_id
+            vehicle: Vehicle parameters
+            
+        Returns:
+            Penalty multiplier per way (inf = blocked)
+        """
+        return np.fromiter(
+            (self._get_truck_restriction_penalty(tags, vehicle) for tags in edge_tags),
+            dtype=np.float64,
+            count=len(edge_tags)
+        )
     
-    def _get_safety_weight(self, edge_data: Dict) -> float:
+    def _get_safety_weights(
+        self,
+        seg_lats: np.ndarray,
+        seg_lons: np.ndarray
+    ) -> np.ndarray:
         """
-        Calculate safety weight based on the presence of automotive services
-        (fuel stations and car repair shops) near the road segment.
-
-        The midpoint of the edge is used as the reference coordinate for
-        proximity checks. If no geometry is available, the weight defaults
-        to the no-service penalty.
+        Safety weight of many segment midpoints at once
 
         Weight factors (from SERVICE_PROXIMITY_FACTORS):
             - fuel_station_bonus : multiplied in when a fuel station is nearby
@@ -163,60 +292,41 @@ class ScoringService:
             - no_service_penalty : multiplied in when neither service is nearby
 
         Returns:
-            float: service_factor - 1.0  (compatible with calculate_edge_weight)
+            np.ndarray: service_factor - 1.0 per midpoint
         """
-        # Retrieve the segment midpoint from edge data (set during graph build)
-        # If not available, we cannot do proximity checks — apply a neutral weight.
-        seg_lat: Optional[float] = edge_data.get("seg_lat")
-        seg_lon: Optional[float] = edge_data.get("seg_lon")
-
-        if seg_lat is None or seg_lon is None:
-            # No positional information available: use neutral factor
-            return 0.0
+        fuel_nearby = self._services_nearby(seg_lats, seg_lons, self._fuel_tree)
+        repair_nearby = self._services_nearby(seg_lats, seg_lons, self._repair_tree)
 
-        # Check proximity to each service type using the pre-built KDTrees
-        fuel_nearby = self._has_service_nearby(
-            seg_lat, seg_lon, self._fuel_tree
-        )
-        repair_nearby = self._has_service_nearby(
-            seg_lat, seg_lon, self._repair_tree
+        service_factor = (
+            np.where(fuel_nearby, SERVICE_PROXIMITY_FACTORS["fuel_station_bonus"], 1.0) *
+            np.where(repair_nearby, SERVICE_PROXIMITY_FACTORS["repair_shop_bonus"], 1.0) *
+            np.where(
+                ~fuel_nearby & ~repair_nearby,
+                SERVICE_PROXIMITY_FACTORS["no_service_penalty"], 1.0
+            )
         )
 
-        service_factor = 1.0
-
-        if fuel_nearby:
-            service_factor *= SERVICE_PROXIMITY_FACTORS["fuel_station_bonus"]
-
-        if repair_nearby:
-            service_factor *= SERVICE_PROXIMITY_FACTORS["repair_shop_bonus"]
-
-        if not fuel_nearby and not repair_nearby:
-            service_factor *= SERVICE_PROXIMITY_FACTORS["no_service_penalty"]
-
         return service_factor - 1.0
 
-    def _has_service_nearby(
+    def _services_nearby(
         self,
-        lat: float,
-        lon: float,
+        lats: np.ndarray,
+        lons: np.ndarray,
         tree: Optional[KDTree]
-    ) -> bool:
+    ) -> np.ndarray:
         """
-        Return True if any service location is within SERVICE_RADIUS_KM of
-        (lat, lon), using a pre-built KDTree for O(log S) lookup.
+        Whether any service lies within SERVICE_RADIUS_KM of each point,
+        using one ball query on the pre-built KDTree for all points
 
-        Args:
-            lat, lon: Query point in degrees.
-            tree: KDTree built from service coordinates in radians.
-                  If None (no services exist), returns False immediately.
+        Returns:
+            Boolean array, True where a service is within SERVICE_RADIUS_KM
         """
-        if tree is None:
-            return False
+        if tree is None or len(lats) == 0:
+            return np.zeros(len(lats), dtype=bool)
 
-        # Convert query point to radians on unit sphere
-        point = np.array([[radians(lat), radians(lon)]])
-        matches = tree.query_ball_point(point, r=self._radius_rad)
-        return len(matches[0]) > 0
+        points = np.column_stack((np.radians(lats), np.radians(lons)))
+        counts = tree.query_ball_point(points, r=self._radius_rad, return_length=True)
+        return counts > 0
 
     @staticmethod
     def _build_kdtree(
@@ -239,7 +349,7 @@ class ScoringService:
     
     def _get_truck_restriction_penalty(
         self,
-        edge_data: Dict,
+        tags: EdgeTags,
         vehicle: VehicleParams
     ) -> float:
         """
@@ -249,22 +359,22 @@ class ScoringService:
             Penalty multiplier or inf if road is blocked
         """
         # Check height restriction
-        maxheight = edge_data.get("maxheight")
+        maxheight = tags.maxheight
         if maxheight and vehicle.height and vehicle.height > maxheight:
             return float('inf')  # Cannot pass
         
         # Check weight restriction
-        maxweight = edge_data.get("maxweight")
+        maxweight = tags.maxweight
         if maxweight and vehicle.weight and vehicle.weight > maxweight:
             return float('inf')  # Cannot pass
         
         # Check HGV (Heavy Goods Vehicle) restriction
-        hgv = edge_data.get("hgv")
+        hgv = tags.hgv
         if hgv == "no" and vehicle.vehicle_type == "truck":
             return float('inf')  # Trucks not allowed
         
         # Check access restriction
-        access = edge_data.get("access")
+        access = tags.access
         if access in ["private", "no"] and vehicle.vehicle_type == "truck":
             return float('inf')  # Access denied
         
@@ -279,183 +389,144 @@ class ScoringService:
         
         return penalty
     
-    def generate_alerts_for_edge(
+    def generate_alerts_batch(
         self,
-        edge_data: Dict,
-        vehicle: Optional[VehicleParams] = None,
-        node_lat: Optional[float] = None,
-        node_lon: Optional[float] = None
-    ) -> List[Alert]:
+        graph: RoadGraph,
+        path_edges: np.ndarray,
+        vehicle: Optional[VehicleParams] = None
+    ) -> Tuple[List[Alert], np.ndarray]:
         """
-        Generate alerts for a road segment
+        Generate the alerts of a whole route at once
+        
+        Every alert category is a boolean mask over the route's road
+        edges, and Alert objects are only built for the first edge
+        raising each distinct message (repeats would be deduplicated
+        anyway). Connector edges raise no alerts.
         
         Args:
-            edge_data: Edge data dictionary
+            graph: Road graph
+            path_edges: Edge positions along the route, in order
             vehicle: Vehicle parameters
-            node_lat: Node latitude for alert location
-            node_lon: Node longitude for alert location
             
         Returns:
-            List of alerts
+            List of alerts in route order, one per distinct message, each
+            located at the target node of its edge, and their level codes
+            (see ALERT_LEVELS)
         """
-        alerts = []
-        location = None
-        
-        if node_lat is not None and node_lon is not None:
-            location = Coordinates(lat=node_lat, lon=node_lon)
-        
-        # Skip connector edges
-        if edge_data.get("connector"):
-            return alerts
-        
-        # Surface quality alerts
-        surface = edge_data.get("surface")
-        if surface in ["unpaved", "dirt", "gravel", "mud"]:
-            alerts.append(Alert(
-                level="yellow",
-                message=f"Unpaved road: {surface}",
-                location=location
-            ))
-        elif surface in ["mud", "sand"]:
-            alerts.append(Alert(
-                level="red",
-                message=f"Poor surface condition: {surface}",
-                location=location
-            ))
+        edges = path_edges[graph.tag_ids[path_edges] >= 0]
+        tag_ids = graph.tag_ids[edges]
+        columns = {name: column[tag_ids] for name, column in graph.way_columns.items()}
+        surface_id = columns["surface_id"]
+        smoothness_id = columns["smoothness_id"]
         
-        # Smoothness alerts
-        smoothness = edge_data.get("smoothness")
-        if smoothness in ["bad", "very_bad"]:
-            alerts.append(Alert(
-                level="yellow",
-                message=f"Road quality: {smoothness}",
-                location=location
-            ))
-        elif smoothness in ["horrible", "very_horrible", "impassable"]:
-            alerts.append(Alert(
-                level="red",
-                message=f"Very poor road quality: {smoothness}",
-                location=location
-            ))
+        fuel_nearby = self._services_nearby(
+            graph.seg_lats[edges], graph.seg_lons[edges], self._fuel_tree
+        )
+        repair_nearby = self._services_nearby(
+            graph.seg_lats[edges], graph.seg_lons[edges], self._repair_tree
+        )
         
-        # Safety / service-infrastructure alerts
-        seg_lat: Optional[float] = edge_data.get("seg_lat")
-        seg_lon: Optional[float] = edge_data.get("seg_lon")
-
-        if seg_lat is not None and seg_lon is not None:
-            fuel_nearby = self._has_service_nearby(
-                seg_lat, seg_lon, self._fuel_tree
-            )
-            repair_nearby = self._has_service_nearby(
-                seg_lat, seg_lon, self._repair_tree
-            )
-
-            if fuel_nearby and repair_nearby:
-                alerts.append(Alert(
-                    level="green",
-                    message="Service-rich segment: fuel station and repair shop nearby",
-                    location=location
-                ))
-            elif fuel_nearby:
-                alerts.append(Alert(
-                    level="green",
-                    message="Fuel station nearby",
-                    location=location
-                ))
-            elif repair_nearby:
-                alerts.append(Alert(
-                    level="green",
-                    message="Car repair service nearby",
-                    location=location
-                ))
-            else:
-                alerts.append(Alert(
-                    level="yellow",
-                    message="No fuel stations or repair services nearby",
-                    location=location
-                ))
-
-        # Speed alerts
-        maxspeed = edge_data.get("maxspeed")
-        if maxspeed and maxspeed > 100:
-            alerts.append(Alert(
-                level="yellow",
-                message=f"High speed road: {maxspeed} km/h",
-                location=location
-            ))
+        # (mask, key telling messages apart or None if constant, level,
+        # message); alerts on the same edge follow this order: surface,
+        # smoothness, services, speed, then the truck restrictions
+        categories = [
+            (np.isin(surface_id, tuple(SURFACE_RED_IDS)), surface_id, "red",
+             lambda tags: f"Poor surface condition: {tags.surface}"),
+            (np.isin(surface_id, tuple(SURFACE_YELLOW_IDS)), surface_id, "yellow",
+             lambda tags: f"Unpaved road: {tags.surface}"),
+            (np.isin(smoothness_id, tuple(SMOOTHNESS_RED_IDS)), smoothness_id, "red",
+             lambda tags: f"Very poor road quality: {tags.smoothness}"),
+            (np.isin(smoothness_id, tuple(SMOOTHNESS_YELLOW_IDS)), smoothness_id, "yellow",
+             lambda tags: f"Road quality: {tags.smoothness}"),
+            (fuel_nearby & repair_nearby, None, "green",
+             lambda tags: "Service-rich segment: fuel station and repair shop nearby"),
+            (fuel_nearby & ~repair_nearby, None, "green",
+             lambda tags: "Fuel station nearby"),
+            (~fuel_nearby & repair_nearby, None, "green",
+             lambda tags: "Car repair service nearby"),
+            (~fuel_nearby & ~repair_nearby, None, "yellow",
+             lambda tags: "No fuel stations or repair services nearby"),
+            (columns["maxspeed"] > 100, columns["maxspeed"], "yellow",
+             lambda tags: f"High speed road: {tags.maxspeed} km/h"),
+        ]
         
-        # Truck-specific alerts
         if vehicle and vehicle.vehicle_type == "truck":
-            # Height restriction
-            maxheight = edge_data.get("maxheight")
-            if maxheight:
-                if vehicle.height and vehicle.height > maxheight:
-                    alerts.append(Alert(
-                        level="red",
-                        message=f"Height restriction: {maxheight}m (vehicle: {vehicle.height}m)",
-                        location=location
-                    ))
-                elif vehicle.height and vehicle.height > maxheight * 0.9:
-                    alerts.append(Alert(
-                        level="yellow",
-                        message=f"Tight clearance: {maxheight}m (vehicle: {vehicle.height}m)",
-                        location=location
-                    ))
-            
-            # Weight restriction
-            maxweight = edge_data.get("maxweight")
-            if maxweight:
-                if vehicle.weight and vehicle.weight > maxweight:
-                    alerts.append(Alert(
-                        level="red",
-                        message=f"Weight restriction: {maxweight}t (vehicle: {vehicle.weight}t)",
-                        location=location
-                    ))
-                elif vehicle.weight and vehicle.weight > maxweight * 0.9:
-                    alerts.append(Alert(
-                        level="yellow",
-                        message=f"Near weight limit: {maxweight}t (vehicle: {vehicle.weight}t)",
-                        location=location
-                    ))
+            maxheight = columns["maxheight"]
+            maxweight = columns["maxweight"]
+            access_id = columns["access_id"]
             
-            # HGV restriction
-            hgv = edge_data.get("hgv")
-            if hgv == "no":
-                alerts.append(Alert(
-                    level="red",
-                    message="Trucks not allowed (HGV restriction)",
-                    location=location
-                ))
-            elif hgv == "destination":
-                alerts.append(Alert(
-                    level="yellow",
-                    message="Destination traffic only for trucks",
-                    location=location
-                ))
+            # Dimension checks only apply when the vehicle gives them
+            too_high = tight = too_heavy = near_limit = np.zeros(len(edges), dtype=bool)
+            if vehicle.height:
+                too_high = (maxheight > 0) & (vehicle.height > maxheight)
+                tight = (maxheight > 0) & ~too_high & (vehicle.height > maxheight * 0.9)
+            if vehicle.weight:
+                too_heavy = (maxweight > 0) & (vehicle.weight > maxweight)
+                near_limit = (maxweight > 0) & ~too_heavy & (vehicle.weight > maxweight * 0.9)
             
-            # Access restriction
-            access = edge_data.get("access")
-            if access in ["private", "no"]:
-                alerts.append(Alert(
-                    level="red",
-                    message=f"Access restricted: {access}",
-                    location=location
-                ))
-            elif access in ["delivery", "destination"]:
-                alerts.append(Alert(
-                    level="yellow",
-                    message=f"Limited access: {access}",
-                    location=location
-                ))
-        
-        return alerts
+            categories += [
+                (too_high, maxheight, "red",
+                 lambda tags: f"Height restriction: {tags.maxheight}m (vehicle: {vehicle.height}m)"),
+                (tight, maxheight, "yellow",
+                 lambda tags: f"Tight clearance: {tags.maxheight}m (vehicle: {vehicle.height}m)"),
+                (too_heavy, maxweight, "red",
+                 lambda tags: f"Weight restriction: {tags.maxweight}t (vehicle: {vehicle.weight}t)"),
+                (near_limit, maxweight, "yellow",
+                 lambda tags: f"Near weight limit: {tags.maxweight}t (vehicle: {vehicle.weight}t)"),
+                (columns["hgv_id"] == HGV_ID["no"], None, "red",
+                 lambda tags: "Trucks not allowed (HGV restriction)"),
+                (columns["hgv_id"] == HGV_ID["destination"], None, "yellow",
+                 lambda tags: "Destination traffic only for trucks"),
+                (np.isin(access_id, tuple(DENIED_ACCESS_IDS)), access_id, "red",
+                 lambda tags: f"Access restricted: {tags.access}"),
+                (np.isin(access_id, tuple(LIMITED_ACCESS_IDS)), access_id, "yellow",
+                 lambda tags: f"Limited access: {tags.access}"),
+            ]
+        
+        # First edge of every distinct message, per category
+        found = []
+        for rank, (mask, keys, level, message) in enumerate(categories):
+            hits = np.flatnonzero(mask)
+            if keys is None:
+                hits = hits[:1]
+            elif len(hits):
+                _, first = np.unique(keys[hits], return_index=True)
+                hits = hits[first]
+            found += [(i, rank, level, message) for i in hits.tolist()]
+        
+        # Route order, then category order within an edge
+        found.sort(key=lambda hit: hit[:2])
+        
+        # Alerts are built from graph data we produced ourselves, so they
+        # skip Pydantic validation via model_construct
+        alerts = []
+        for i, _, level, message in found:
+            node = graph.cols[edges[i]]
+            alerts.append(Alert.model_construct(
+                level=level,
+                message=message(graph.edge_tags[tag_ids[i]]),
+                location=Coordinates.model_construct(
+                    lat=float(graph.lats[node]), lon=float(graph.lons[node])
+                )
+            ))
+        
+        levels = np.fromiter(
+            (self.ALERT_LEVELS.index(level) for _, _, level, _ in found), np.int8, len(found)
+        )
+        return alerts, levels
     
-    def summarize_alerts(self, alerts: List[Alert]) -> str:
+    def summarize_alerts(
+        self,
+        alerts: List[Alert],
+        levels: Optional[np.ndarray] = None
+    ) -> str:
         """
         Create a human-readable summary of alerts
         
         Args:
             alerts: List of alerts
+            levels: Level code of each alert (see ALERT_LEVELS); counted
+                with a single bincount when given
             
         Returns:
             Summary string
@@ -463,8 +534,13 @@ class ScoringService:
         if not alerts:
             return "Route is clear with no warnings"
         
-        red_count = sum(1 for a in alerts if a.level == "red")
-        yellow_count = sum(1 for a in alerts if a.level == "yellow")
+        if levels is not None:
+            _, yellow_count, red_count = np.bincount(
+                levels, minlength=len(self.ALERT_LEVELS)
+            ).tolist()
+        else:
+            red_count = sum(1 for a in alerts if a.level == "red")
+            yellow_count = sum(1 for a in alerts if a.level == "yellow")
         
         parts = []
         if red_count > 0:
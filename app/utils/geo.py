@@ -0,0 +1,76 @@
+"""
+OpenRoute Navigator - Geodesic Helpers
+
+Haversine distances, JIT-compiled with numba when it is installed
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # numba is optional: fall back to plain NumPy
+    numba = None
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _haversine_numpy(lat1, lon1, lat2, lon2):
+    """Haversine distance in km, broadcast element-wise by NumPy"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+    return EARTH_RADIUS_KM * c
+
+
+if numba is not None:
+    @numba.njit(fastmath=True, cache=True)
+    def _haversine_kernel(lat1, lon1, lat2, lon2):
+        """Haversine distance in km of 1-D coordinate arrays"""
+        out = np.empty(lat1.shape[0])
+        for i in range(lat1.shape[0]):
+            phi1 = np.radians(lat1[i])
+            phi2 = np.radians(lat2[i])
+            dphi = phi2 - phi1
+            dlmb = np.radians(lon2[i] - lon1[i])
+            a = np.sin(dphi/2)**2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb/2)**2
+            out[i] = 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+        return out
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Calculate distance between points using Haversine formula
+
+    Accepts scalars or NumPy arrays (broadcast element-wise), so a whole
+    batch of segments is measured in a single call. Same-shape 1-D float
+    arrays go through the numba kernel when numba is available.
+
+    Returns:
+        Distance in kilometers (float or ndarray)
+    """
+    if numba is not None and _is_segment_batch(lat1, lon1, lat2, lon2):
+        return _haversine_kernel(lat1, lon1, lat2, lon2)
+    return _haversine_numpy(lat1, lon1, lat2, lon2)
+
+
+def _is_segment_batch(*arrays) -> bool:
+    """True if all arguments are 1-D float64 arrays of the same length"""
+    first = arrays[0]
+    return all(
+        isinstance(a, np.ndarray) and a.ndim == 1 and a.dtype == np.float64
+        and a.shape == first.shape
+        for a in arrays
+    )
+
+
+def warm_up() -> None:
+    """Compile (or load the cached) numba kernel ahead of the first request"""
+    if numba is not None:
+        coords = np.zeros(2)
+        haversine_km(coords, coords, coords, coords)
@@ -4,6 +4,9 @@ OpenRoute Navigator - OSM Weight Configurations
 Configurable weight mappings for different road attributes
 """
 
+from typing import Dict, Optional, Tuple
+import numpy as np
+
 # Highway type weights (lower is better for routing)
 HIGHWAY_WEIGHTS = {
     # Major roads
@@ -81,6 +84,41 @@ SMOOTHNESS_WEIGHTS = {
 }
 
 
+def _lookup_table(weights: Dict[str, float], absent: float) -> Tuple[Dict[str, int], np.ndarray]:
+    """
+    Intern the keys of a weight mapping into a NumPy lookup table
+    
+    Args:
+        weights: Tag value -> weight mapping (must contain "default")
+        absent: Weight for edges without the tag, stored in the last slot
+        
+    Returns:
+        Tag value -> integer ID mapping, and the weight table it indexes
+    """
+    ids = {name: i for i, name in enumerate(weights)}
+    table = np.array([*weights.values(), absent], dtype=np.float64)
+    return ids, table
+
+
+def intern_tag(value: Optional[str], ids: Dict[str, int]) -> int:
+    """
+    Integer ID of a tag value in a lookup table
+    
+    Unknown values map to "default", missing values to the absent slot.
+    """
+    if not value:
+        return len(ids)
+    return ids.get(value, ids["default"])
+
+
+# Integer-indexed versions of the tables above, used for batch scoring.
+# A missing highway tag scores as "default"; missing surface and
+# smoothness tags are neutral (1.0).
+HIGHWAY_ID, HIGHWAY_TABLE = _lookup_table(HIGHWAY_WEIGHTS, HIGHWAY_WEIGHTS["default"])
+SURFACE_ID, SURFACE_TABLE = _lookup_table(SURFACE_WEIGHTS, 1.0)
+SMOOTHNESS_ID, SMOOTHNESS_TABLE = _lookup_table(SMOOTHNESS_WEIGHTS, 1.0)
+
+
 # Track type weights (for unpaved roads)
 TRACKTYPE_WEIGHTS = {
     "grade1": 1.5,  # Solid surface
@@ -107,22 +145,18 @@ SERVICE_PROXIMITY_FACTORS = {
 }
 
 
-# Speed-based safety penalties (for high-speed roads)
+# Speed-based safety penalties (for high-speed roads): limits up to each
+# threshold (inclusive) get the matching penalty, faster roads the last one
+_SPEED_THRESHOLDS = np.array([40, 60, 80, 100], dtype=np.int16)
+_SPEED_PENALTIES = np.array([1.0, 1.2, 1.5, 2.0, 3.0], dtype=np.float64)
+
+
 def get_speed_penalty(maxspeed: int) -> float:
     """
     Calculate safety penalty based on speed limit
     Higher speeds = higher penalty for safety-conscious routing
     """
-    if maxspeed <= 40:
-        return 1.0
-    elif maxspeed <= 60:
-        return 1.2
-    elif maxspeed <= 80:
-        return 1.5
-    elif maxspeed <= 100:
-        return 2.0
-    else:
-        return 3.0
+    return float(_SPEED_PENALTIES[np.searchsorted(_SPEED_THRESHOLDS, maxspeed)])
 
 
 # Truck restriction factors
@@ -143,6 +177,26 @@ TRUCK_RESTRICTIONS = {
 }
 
 
+# Interned restriction tags (unknown values map to "default")
+HGV_ID = {name: i for i, name in enumerate(TRUCK_RESTRICTIONS["hgv"])}
+ACCESS_ID = {name: i for i, name in enumerate(TRUCK_RESTRICTIONS["access"])}
+
+
+# Tag values that trigger route alerts (the red and yellow sets are disjoint)
+SURFACE_RED = frozenset({"mud", "sand"})
+SURFACE_YELLOW = frozenset({"unpaved", "dirt", "gravel"})
+SMOOTHNESS_RED = frozenset({"horrible", "very_horrible", "impassable"})
+SMOOTHNESS_YELLOW = frozenset({"bad", "very_bad"})
+
+# ... and their interned IDs, for batch alert masks
+SURFACE_RED_IDS = frozenset(SURFACE_ID[s] for s in SURFACE_RED)
+SURFACE_YELLOW_IDS = frozenset(SURFACE_ID[s] for s in SURFACE_YELLOW)
+SMOOTHNESS_RED_IDS = frozenset(SMOOTHNESS_ID[s] for s in SMOOTHNESS_RED)
+SMOOTHNESS_YELLOW_IDS = frozenset(SMOOTHNESS_ID[s] for s in SMOOTHNESS_YELLOW)
+DENIED_ACCESS_IDS = frozenset(ACCESS_ID[a] for a in ("private", "no"))
+LIMITED_ACCESS_IDS = frozenset(ACCESS_ID[a] for a in ("delivery", "destination"))
+
+
 # Default values for missing tags
 DEFAULTS = {
     "maxspeed": 50,  # km/h
@@ -184,3 +238,12 @@ CRITERIA_MULTIPLIERS = {
         "safety": 0.5
     }
 }
+
+
+# Criteria multipliers as contiguous arrays, in MULTIPLIER_KEYS order, so
+# scoring unpacks five floats instead of doing five string-keyed lookups
+MULTIPLIER_KEYS = ("distance", "highway_type", "surface", "smoothness", "safety")
+CRITERIA_MULT_ARR = {
+    name: np.array([multipliers[key] for key in MULTIPLIER_KEYS], dtype=np.float64)
+    for name, multipliers in CRITERIA_MULTIPLIERS.items()
+}
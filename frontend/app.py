@@ -4,7 +4,7 @@ Aplicação Streamlit para visualização de rotas com múltiplos critérios
 """
 
 import streamlit as st
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
 import sys
 import os
 import time
@@ -17,9 +17,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
 
 # Importar módulos locais
-from services.ors_geocoding import ORSGeocodingService
+from services.ors_geocoding import ORSGeocodingService, _normalize_address
 from services.backend_client import BackendClient
-from utils.map_utils import create_route_map, create_simple_route_map
+from utils.map_utils import render_route_map_html, create_simple_route_map
 from ui.layout import (
     show_header,
     show_input_form,
@@ -46,6 +46,23 @@ st.set_page_config(
 )
 
 
+@st.cache_resource(show_spinner=False)
+def _cached_backend_client(backend_url: str) -> BackendClient:
+    """
+    Cliente do back-end compartilhado por todas as sessões e reruns,
+    reaproveitando a mesma requests.Session (e suas conexões).
+    """
+    return BackendClient(base_url=backend_url)
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_geocoding_service(api_key: str) -> ORSGeocodingService:
+    """
+    Serviço de geocoding compartilhado por todas as sessões e reruns.
+    """
+    return ORSGeocodingService(api_key=api_key)
+
+
 @st.cache_resource(show_spinner=False)
 def _cached_warmup_backend(backend_url: str, max_wait: int, poll: int) -> bool:
     """
@@ -53,11 +70,22 @@ def _cached_warmup_backend(backend_url: str, max_wait: int, poll: int) -> bool:
     (st.cache_resource persiste enquanto o processo Streamlit estiver ativo).
     Bloqueia a thread do cache até o back-end responder ou o timeout estourar.
     """
-    client = BackendClient(base_url=backend_url)
+    client = _cached_backend_client(backend_url)
     ok, _ = client.wake_up(max_wait_seconds=max_wait, poll_interval=poll)
     return ok
 
 
+@st.cache_data(ttl=5.0, show_spinner=False)
+def _cached_backend_health(backend_url: str) -> bool:
+    """
+    Health check do back-end com TTL curto: no máximo uma requisição HTTP
+    a cada 5 segundos, por mais reruns que o Streamlit faça nesse intervalo.
+    Chaveado pela URL (string), não pela instância do cliente.
+    """
+    ok, _ = _cached_backend_client(backend_url).health_check()
+    return ok
+
+
 @st.cache_resource(show_spinner=False)
 def _cached_warmup_fuel(max_wait: int, poll: int) -> bool:
     """
@@ -67,6 +95,33 @@ def _cached_warmup_fuel(max_wait: int, poll: int) -> bool:
     return ok
 
 
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _geocode_cached(api_key: str, address: str):
+    """
+    Geocodifica um endereço já normalizado, cacheando o resultado por 1h.
+    Reruns com a mesma origem/destino não voltam à rede (erros não são
+    cacheados, então uma falha é tentada de novo no próximo envio).
+
+    Returns:
+        Tuple (latitude, longitude, estado_uf_raw)
+    """
+    return _cached_geocoding_service(api_key).geocode_with_state(address)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _route_map_html(origin_coords: tuple, dest_coords: tuple, routes: list,
+                    origin_name: str, dest_name: str) -> str:
+    """
+    HTML do mapa de rotas, cacheado pelo conteúdo das rotas — reruns com o
+    mesmo resultado não remontam nem re-renderizam o mapa Folium.
+    """
+    return render_route_map_html(
+        origin_coords[0], origin_coords[1],
+        dest_coords[0], dest_coords[1],
+        routes, origin_name, dest_name
+    )
+
+
 def initialize_services():
     """
     Inicializa os serviços e garante o warm-up confiável de AMBAS as APIs
@@ -83,10 +138,10 @@ def initialize_services():
         Tuple com (geocoding_service, backend_client)
     """
     if 'geocoding_service' not in st.session_state:
-        st.session_state.geocoding_service = ORSGeocodingService(api_key=config.ORS_API_KEY)
+        st.session_state.geocoding_service = _cached_geocoding_service(config.ORS_API_KEY)
 
     if 'backend_client' not in st.session_state:
-        st.session_state.backend_client = BackendClient(base_url=config.BACKEND_URL)
+        st.session_state.backend_client = _cached_backend_client(config.BACKEND_URL)
 
     # ── Wake-up do BACK-END ──────────────────────────────────────────────────
     if 'backend_warmup_done' not in st.session_state:
@@ -117,7 +172,9 @@ def check_backend_status(backend_client: BackendClient, status_placeholder) -> b
     Lê o resultado do warm-up do back-end já iniciado em background.
 
     Se o warm-up ainda não terminou, exibe status de espera mas NÃO bloqueia
-    a thread principal — o formulário continua disponível.
+    a thread principal — o formulário continua disponível. Se o warm-up
+    falhou, o back-end é verificado de novo via health check cacheado (TTL
+    de 5s), para detectar quando ele voltar sem uma requisição por rerun.
 
     Args:
         backend_client:    Cliente do back-end
@@ -140,6 +197,10 @@ def check_backend_status(backend_client: BackendClient, status_placeholder) -> b
     if warmup_ok:
         return True
 
+    if _cached_backend_health(backend_client.base_url):
+        st.session_state.backend_warmup_ok = True
+        return True
+
     # Warm-up terminou mas falhou — mostra diagnóstico
     status_placeholder.error("❌ Back-end não respondeu (timeout)")
     return False
@@ -162,13 +223,18 @@ def geocode_addresses(geocoding_service, origin: str, destination: str, vehicle_
     try:
         # Geocodificar origem — usa método extendido para capturar estado
         show_loading_with_vehicle("Localizando origem...", vehicle_type)
-        origin_lat, origin_lon, state_raw = geocoding_service.geocode_with_state(origin)
+        origin_lat, origin_lon, state_raw = _geocode_cached(
+            geocoding_service.api_key, _normalize_address(origin)
+        )
         estado_uf = fuel_service.normalize_state_to_uf(state_raw)
         show_success(f"Origem encontrada: {origin}")
 
-        # Geocodificar destino — método padrão (só precisamos do estado da origem)
+        # Geocodificar destino — mesmo cache da origem (o estado é descartado)
         show_loading_with_vehicle("Localizando destino...", vehicle_type)
-        dest_coords = geocoding_service.geocode(destination)
+        dest_lat, dest_lon, _ = _geocode_cached(
+            geocoding_service.api_key, _normalize_address(destination)
+        )
+        dest_coords = (dest_lat, dest_lon)
         show_success(f"Destino encontrado: {destination}")
 
         return (origin_lat, origin_lon), dest_coords, estado_uf
@@ -203,6 +269,8 @@ def calculate_routes(backend_client, form_data, origin_coords, dest_coords):
     
     try:
         show_loading_with_vehicle("Calculando rotas...", vehicle_type)
+        # A resposta fica no cache do BackendClient (compartilhado via
+        # st.cache_resource): trocar só o critério exibido não repete o POST
         result = backend_client.calculate_route(
             origin_lat, origin_lon,
             dest_lat, dest_lon,
@@ -257,23 +325,33 @@ def calculate_routes(backend_client, form_data, origin_coords, dest_coords):
         return None
 
 
-def find_selected_route(routes, criteria):
+def index_routes_by_type(routes):
+    """
+    Indexa as rotas pelo tipo (critério), uma única vez por resposta
+    
+    Args:
+        routes: Lista de rotas
+        
+    Returns:
+        Dict tipo -> rota (a primeira de cada tipo, na ordem da lista)
+    """
+    return {route.get('type'): route for route in reversed(routes)}
+
+
+def find_selected_route(route_by_type, routes, criteria):
     """
     Encontra a rota correspondente ao critério selecionado
     
     Args:
+        route_by_type: Índice de rotas por tipo (ver index_routes_by_type)
         routes: Lista de rotas
         criteria: Critério selecionado
         
     Returns:
         Rota encontrada ou primeira rota disponível
     """
-    for route in routes:
-        if route.get('type') == criteria:
-            return route
-    
     # Se não encontrar, retornar a primeira
-    return routes[0] if routes else None
+    return route_by_type.get(criteria) or (routes[0] if routes else None)
 
 
 def display_map(origin_coords, dest_coords, routes, origin_name, dest_name):
@@ -287,21 +365,14 @@ def display_map(origin_coords, dest_coords, routes, origin_name, dest_name):
         origin_name: Nome da origem
         dest_name: Nome do destino
     """
-    origin_lat, origin_lon = origin_coords
-    dest_lat, dest_lon = dest_coords
-    
-    # Criar mapa com todas as rotas
-    route_map = create_route_map(
-        origin_lat, origin_lon,
-        dest_lat, dest_lon,
-        routes,
-        origin_name,
-        dest_name
+    # Renderizar (ou reaproveitar do cache) o mapa com todas as rotas
+    map_html = _route_map_html(
+        tuple(origin_coords), tuple(dest_coords), routes, origin_name, dest_name
     )
     
-    # Exibir mapa
+    # Exibir mapa (mesma moldura do streamlit_folium.folium_static)
     st.subheader("🗺️ Visualização da Rota")
-    folium_static(route_map, width=config.MAP_WIDTH, height=config.MAP_HEIGHT)
+    components.html(map_html, width=config.MAP_WIDTH, height=config.MAP_HEIGHT + 10)
 
 
 def main():
@@ -389,7 +460,8 @@ def main():
         st.divider()
         
         # Encontrar rota selecionada
-        selected_route = find_selected_route(routes, criteria)
+        route_by_type = index_routes_by_type(routes)
+        selected_route = find_selected_route(route_by_type, routes, criteria)
         
         if selected_route:
             # Exibir resumo da rota selecionada
@@ -61,6 +61,17 @@ GEOCODING_TIMEOUT = 10
 # Render free tier: cold start (~60s) + Overpass API query (~180s) = 240s de margem
 ROUTING_TIMEOUT = 240
 
+# ---------------------------------------------------------------------------
+# Cache persistente de geocoding (sqlite)
+# ---------------------------------------------------------------------------
+# Sobrevive a reinícios do processo Streamlit; string vazia desativa o cache
+GEOCODE_CACHE_PATH = os.environ.get(
+    "GEOCODE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".gps_project", "geocode_cache.db")
+)
+# Validade das entradas (segundos) — padrão: 30 dias
+GEOCODE_CACHE_TTL = int(os.environ.get("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+
 # ---------------------------------------------------------------------------
 # Configurações do mapa
 # ---------------------------------------------------------------------------
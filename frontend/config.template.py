@@ -15,6 +15,10 @@ BACKEND_URL = "http://localhost:8000"
 GEOCODING_TIMEOUT = 10
 ROUTING_TIMEOUT = 90
 
+# Cache persistente de geocoding (sqlite); string vazia desativa o cache
+GEOCODE_CACHE_PATH = "~/.gps_project/geocode_cache.db"
+GEOCODE_CACHE_TTL = 30 * 24 * 3600  # segundos
+
 # Configurações do mapa
 DEFAULT_ZOOM = 13
 MAP_WIDTH = 1200
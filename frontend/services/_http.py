@@ -0,0 +1,75 @@
+"""
+Sessão HTTP compartilhada pelos clientes do front-end
+
+O back-end e a API de geocoding do OpenRouteService usam a mesma
+requests.Session, cada um com seu próprio adapter (pool keep-alive; só o
+do ORS repete requisições). Os headers ficam em cada requisição, nunca na
+sessão.
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+ORS_BASE_URL = "https://api.openrouteservice.org"
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _backend_adapter() -> HTTPAdapter:
+    """
+    Adapter padrão (back-end FastAPI, local ou no Render)
+
+    Sem retries: um back-end fora do ar falha na hora, e o wake_up
+    controla a própria espera.
+    """
+    return HTTPAdapter(pool_maxsize=16)
+
+
+def _ors_adapter() -> HTTPAdapter:
+    """
+    Adapter da API do OpenRouteService
+
+    Uma conexão keep-alive (TLS) reaproveitada por todas as chamadas,
+    com backoff automático em 429/5xx (respeitando Retry-After). Ao
+    esgotar as tentativas a última resposta é devolvida normalmente.
+    """
+    return HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=32,
+        pool_block=False,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False
+        )
+    )
+
+
+def shared_session() -> requests.Session:
+    """
+    Retorna a sessão compartilhada, criando-a na primeira chamada
+
+    O requests escolhe o adapter pelo prefixo mais longo da URL, então o
+    host do ORS usa o próprio pool e qualquer outra URL cai no do back-end.
+
+    Returns:
+        requests.Session com os adapters montados
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                backend_adapter = _backend_adapter()
+                session.mount("http://", backend_adapter)
+                session.mount("https://", backend_adapter)
+                session.mount(ORS_BASE_URL, _ors_adapter())
+                _session = session
+    return _session
@@ -3,16 +3,77 @@ Cliente para comunicação com o back-end FastAPI do OpenRoute Navigator
 """
 
 import requests
-from typing import Dict, Optional, List, Any
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, List, Any, Tuple
+import threading
 import time
 import logging
 
+from ._http import shared_session
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # orjson é opcional: usa o json da biblioteca padrão
+    import json
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    import ijson
+    _STREAM_ERRORS = (ijson.JSONError,)
+except ImportError:  # ijson é opcional: sem ele a resposta é lida inteira
+    ijson = None
+    _STREAM_ERRORS = ()
+
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Exceção e mensagem por status HTTP de erro de /route/calculate
+_BACKEND_ERRORS = {
+    422: (ValueError, "Erro de validação: {detail}"),
+    500: (ConnectionError, "Erro interno do servidor"),
+}
+_BACKEND_UNKNOWN_ERROR = (ConnectionError, "Erro na API: Status {status}")
+
+# Esqueleto do corpo de /route/calculate: só as coordenadas mudam a cada clique
+_ROUTE_BODY = b'{"origin":{"lat":%a,"lon":%a},"destination":{"lat":%a,"lon":%a},"vehicle":%s}'
+
+
+@lru_cache(maxsize=64)
+def _vehicle_json(vehicle_type: str, height: Optional[float], weight: Optional[float]) -> bytes:
+    """
+    Serializa o objeto "vehicle" do payload (memoizado por veículo)
+
+    Altura e peso só são enviados para caminhão.
+    """
+    vehicle = {"vehicle_type": vehicle_type}
+    if vehicle_type == "truck":
+        if height is not None:
+            vehicle["height"] = height
+        if weight is not None:
+            vehicle["weight"] = weight
+    return _dumps(vehicle)
+
 
 class BackendClient:
     """Cliente para comunicação com a API back-end"""
     
+    # Timeouts (conexão, leitura) padrão do health check: no pior caso ~2s
+    # com o back-end fora do ar. Os reruns já são cacheados pelo app.
+    HEALTH_CONNECT_TIMEOUT = 1.0
+    HEALTH_READ_TIMEOUT = 1.0
+    # Respostas completas de /route/calculate reaproveitadas por rota e
+    # veículo (0 desliga o cache)
+    ROUTE_CACHE_TTL = 60.0
+    ROUTE_CACHE_SIZE = 32
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         """
         Inicializa o cliente
@@ -21,16 +82,21 @@ class BackendClient:
             base_url: URL base da API back-end
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json'
-        })
+        # Sessão keep-alive compartilhada com o geocoding (ver services._http)
+        self.session = shared_session()
+        # chave da rota -> (instante monotônico, resposta), em ordem LRU
+        self._route_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._route_cache_lock = threading.Lock()
     
-    def health_check(self, timeout: int = 8) -> tuple:
+    def health_check(self, timeout: float = HEALTH_READ_TIMEOUT) -> tuple:
         """
         Verificação rápida de disponibilidade do back-end.
         Usa GET / com Cache-Control: no-store e timeout curto.
-        NÃO bloqueia o fluxo principal.
+        NÃO bloqueia o fluxo principal: a conexão desiste após
+        HEALTH_CONNECT_TIMEOUT segundos e a leitura após timeout segundos.
+
+        Args:
+            timeout: Timeout de leitura (padrão: HEALTH_READ_TIMEOUT)
 
         Returns:
             (True, "") se respondeu OK.
@@ -41,7 +107,7 @@ class BackendClient:
             logger.debug("[BackendClient] health_check → GET %s (timeout=%ds)", url, timeout)
             response = self.session.get(
                 url,
-                timeout=timeout,
+                timeout=(min(self.HEALTH_CONNECT_TIMEOUT, timeout), timeout),
                 headers={"Cache-Control": "no-store"},
             )
             if response.status_code == 200:
@@ -81,6 +147,8 @@ class BackendClient:
         last_detail = "Nenhuma tentativa realizada"
         while elapsed < max_wait_seconds:
             attempt += 1
+            # Cold start do Render aceita a conexão mas demora a responder:
+            # aqui a leitura espera o intervalo inteiro de polling
             ok, detail = self.health_check(timeout=poll_interval)
             if ok:
                 logger.info(
@@ -118,6 +186,10 @@ class BackendClient:
         """
         Calcula rotas entre origem e destino
         
+        A resposta é reaproveitada por ROUTE_CACHE_TTL segundos para a mesma
+        origem, destino e veículo (LRU de ROUTE_CACHE_SIZE entradas), também
+        por get_route_by_criteria e get_all_routes.
+        
         Args:
             origin_lat: Latitude da origem
             origin_lon: Longitude da origem
@@ -136,46 +208,69 @@ class BackendClient:
             ValueError: Se a resposta for inválida
             TimeoutError: Se a requisição exceder o timeout
         """
-        # Montar payload da requisição
-        payload = {
-            "origin": {
-                "lat": origin_lat,
-                "lon": origin_lon
-            },
-            "destination": {
-                "lat": dest_lat,
-                "lon": dest_lon
-            },
-            "vehicle": {
-                "vehicle_type": vehicle_type
-            }
-        }
+        key = _route_key(origin_lat, origin_lon, dest_lat, dest_lon, vehicle_type, height, weight)
+        cached = self._cached_route(key)
+        if cached is not None:
+            return cached
+        
+        body = _route_body(origin_lat, origin_lon, dest_lat, dest_lon, vehicle_type, height, weight)
+        response = self._post_route(body, timeout)
+        try:
+            result = _loads(response.content)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Resposta mal formatada do servidor: {str(e)}")
         
-        # Adicionar parâmetros de caminhão se fornecidos
-        if vehicle_type == "truck":
-            if height is not None:
-                payload["vehicle"]["height"] = height
-            if weight is not None:
-                payload["vehicle"]["weight"] = weight
+        if self.ROUTE_CACHE_SIZE:
+            with self._route_cache_lock:
+                self._route_cache[key] = (time.monotonic(), result)
+                self._route_cache.move_to_end(key)
+                if len(self._route_cache) > self.ROUTE_CACHE_SIZE:
+                    self._route_cache.popitem(last=False)
+        return result
+    
+    def _cached_route(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Resposta completa ainda válida para a rota, ou None"""
+        with self._route_cache_lock:
+            entry = self._route_cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ROUTE_CACHE_TTL:
+                del self._route_cache[key]
+                return None
+            self._route_cache.move_to_end(key)
+            return entry[1]
+    
+    def _post_route(self, body: bytes, timeout: int, stream: bool = False) -> requests.Response:
+        """
+        POST em /route/calculate, mapeando erros HTTP e de rede
         
+        Args:
+            body: Corpo JSON já serializado
+            timeout: Tempo máximo de espera pela resposta
+            stream: Se True, o corpo da resposta não é lido antecipadamente
+            
+        Returns:
+            Resposta com status 200
+        """
         try:
             # Fazer requisição POST para o endpoint de cálculo de rota
             response = self.session.post(
                 f"{self.base_url}/route/calculate",
-                json=payload,
-                timeout=timeout
+                data=body,
+                headers=_JSON_HEADERS,
+                timeout=timeout,
+                stream=stream
             )
             
             # Verificar status da resposta
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 422:
-                error_detail = response.json().get('detail', 'Parâmetros inválidos')
-                raise ValueError(f"Erro de validação: {error_detail}")
-            elif response.status_code == 500:
-                raise ConnectionError("Erro interno do servidor")
-            else:
-                raise ConnectionError(f"Erro na API: Status {response.status_code}")
+            status = response.status_code
+            if status == 200:
+                return response
+            exc_cls, message = _BACKEND_ERRORS.get(status, _BACKEND_UNKNOWN_ERROR)
+            detail = None
+            if status == 422:
+                detail = _loads(response.content).get('detail', 'Parâmetros inválidos')
+            raise exc_cls(message.format(status=status, detail=detail))
                 
         except requests.exceptions.Timeout:
             raise TimeoutError("Timeout ao calcular rota. Tente novamente.")
@@ -216,21 +311,49 @@ class BackendClient:
         Returns:
             Dicionário com informações da rota ou None se não encontrada
         """
-        # Calcular todas as rotas
-        result = self.calculate_route(
-            origin_lat, origin_lon, dest_lat, dest_lon,
-            vehicle_type, height, weight
-        )
-        
-        # Procurar pela rota do critério especificado
-        routes = result.get('routes', [])
+        response = None
+        if ijson is None or self.ROUTE_CACHE_SIZE:
+            # Calcular todas as rotas (a resposta inteira fica no cache, e um
+            # get_all_routes em seguida não repete o POST)
+            result = self.calculate_route(
+                origin_lat, origin_lon, dest_lat, dest_lon,
+                vehicle_type, height, weight
+            )
+            routes = result.get('routes', [])
+        else:
+            # Sem cache: lê as rotas uma a uma direto do socket e para na do
+            # critério, sem decodificar as geometrias das rotas seguintes
+            body = _route_body(origin_lat, origin_lon, dest_lat, dest_lon, vehicle_type, height, weight)
+            response = self._post_route(body, timeout=60, stream=True)
+            response.raw.decode_content = True
+            routes = ijson.items(response.raw, 'routes.item', use_float=True)
         
-        for route in routes:
-            if route.get('type') == criteria:
-                return route
+        first = None
+        try:
+            # Procurar pela rota do critério especificado
+            for route in routes:
+                if first is None:
+                    first = route
+                if route.get('type') == criteria:
+                    return route
+        except _STREAM_ERRORS as e:
+            raise ValueError(f"Resposta mal formatada do servidor: {str(e)}")
+        # No streaming, timeouts e quedas de conexão surgem durante a leitura
+        except ReadTimeoutError:
+            raise TimeoutError("Timeout ao calcular rota. Tente novamente.")
+        except ProtocolError:
+            raise ConnectionError(
+                "Não foi possível conectar ao back-end. "
+                "Verifique se o servidor está em execução."
+            )
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"Erro na requisição: {str(e)}")
+        finally:
+            if response is not None:
+                response.close()
         
         # Se não encontrar, retornar a primeira rota disponível
-        return routes[0] if routes else None
+        return first
     
     def get_all_routes(
         self,
@@ -256,6 +379,45 @@ class BackendClient:
         return result.get('routes', [])
 
 
+def _route_key(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    vehicle_type: str,
+    height: Optional[float],
+    weight: Optional[float]
+) -> Tuple:
+    """Chave do cache de rotas (coordenadas arredondadas a ~11 cm)"""
+    if vehicle_type != "truck":
+        height = weight = None  # não são enviados para outros veículos
+    return (
+        round(float(origin_lat), 6), round(float(origin_lon), 6),
+        round(float(dest_lat), 6), round(float(dest_lon), 6),
+        vehicle_type, height, weight
+    )
+
+
+def _route_body(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    vehicle_type: str,
+    height: Optional[float],
+    weight: Optional[float]
+) -> bytes:
+    """
+    Monta o corpo de /route/calculate direto no template (sem dicts
+    intermediários); o objeto do veículo vem serializado do cache
+    """
+    return _ROUTE_BODY % (
+        float(origin_lat), float(origin_lon),
+        float(dest_lat), float(dest_lon),
+        _vehicle_json(vehicle_type, height, weight)
+    )
+
+
 # Criar instância global do cliente
 backend_client = BackendClient()
 
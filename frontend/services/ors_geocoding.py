@@ -5,15 +5,33 @@ Converte endereços de texto em coordenadas geográficas (latitude, longitude)
 usando a API de geocoding do OpenRouteService.
 """
 
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
-import time
+
+from ._http import ORS_BASE_URL, shared_session
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson é opcional: usa o json da biblioteca padrão
+    import json
+    _loads = json.loads
 
 try:
     import config as _config
     _DEFAULT_API_KEY: Optional[str] = getattr(_config, 'ORS_API_KEY', None)
+    _CACHE_PATH: str = getattr(_config, 'GEOCODE_CACHE_PATH', "~/.gps_project/geocode_cache.db")
+    _CACHE_TTL: int = getattr(_config, 'GEOCODE_CACHE_TTL', 30 * 24 * 3600)
 except ImportError:
     _DEFAULT_API_KEY = None
+    _CACHE_PATH = "~/.gps_project/geocode_cache.db"
+    _CACHE_TTL = 30 * 24 * 3600
 
 
 class ORSGeocodingService:
@@ -26,21 +44,26 @@ class ORSGeocodingService:
         Args:
             api_key: Chave da API OpenRouteService (opcional para uso público limitado)
         """
-        self.base_url = "https://api.openrouteservice.org/geocode/search"
+        self.base_url = f"{ORS_BASE_URL}/geocode/search"
         self.api_key = api_key
-        self.session = requests.Session()
+        # Sessão keep-alive compartilhada com o back-end (ver services._http)
+        self.session = shared_session()
         
-        # Configurar headers se houver API key
+        # Headers enviados em cada requisição (a sessão é compartilhada)
+        self.headers: Dict[str, str] = {}
         if self.api_key:
-            self.session.headers.update({
+            self.headers = {
                 'Authorization': self.api_key,
                 'Content-Type': 'application/json'
-            })
+            }
     
     def geocode(self, address: str, timeout: int = 10) -> Tuple[float, float]:
         """
         Converte um endereço em coordenadas geográficas
         
+        Resultados são cacheados em memória (LRU) pelo endereço normalizado,
+        então endereços repetidos não voltam à rede.
+        
         Args:
             address: Endereço completo ou descrição do local
             timeout: Tempo máximo de espera pela resposta (segundos)
@@ -56,57 +79,16 @@ class ORSGeocodingService:
         if not address or not address.strip():
             raise ValueError("Endereço não pode estar vazio")
         
-        try:
-            # Parâmetros da requisição
-            params = {
-                'text': address.strip(),
-                'size': 1  # Retornar apenas o melhor resultado
-            }
-            
-            # Adicionar API key nos parâmetros se disponível
-            if self.api_key:
-                params['api_key'] = self.api_key
-            
-            # Fazer requisição
-            response = self.session.get(
-                self.base_url,
-                params=params,
-                timeout=timeout
-            )
-            
-            # Verificar status da resposta
-            if response.status_code == 401:
-                raise ConnectionError("API key inválida ou não autorizada")
-            elif response.status_code == 429:
-                raise ConnectionError("Limite de requisições excedido. Aguarde alguns minutos.")
-            elif response.status_code != 200:
-                raise ConnectionError(f"Erro na API: Status {response.status_code}")
-            
-            # Parsear resposta
-            data = response.json()
-            
-            # Verificar se encontrou resultados
-            if not data.get('features') or len(data['features']) == 0:
-                raise ValueError(f"Endereço não encontrado: '{address}'")
-            
-            # Extrair coordenadas do primeiro resultado
-            coordinates = data['features'][0]['geometry']['coordinates']
-            lon, lat = coordinates[0], coordinates[1]
-            
-            return (lat, lon)
-            
-        except requests.exceptions.Timeout:
-            raise TimeoutError(f"Timeout ao buscar o endereço: '{address}'")
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError("Falha na conexão com o serviço de geocoding")
-        except requests.exceptions.RequestException as e:
-            raise ConnectionError(f"Erro na requisição: {str(e)}")
-        except (KeyError, IndexError, TypeError) as e:
-            raise ValueError(f"Resposta da API mal formatada: {str(e)}")
+        lat, lon, _ = _search_cached(self.api_key, _normalize_address(address), timeout)
+        return (lat, lon)
     
     def geocode_batch(self, addresses: list) -> Dict[str, Tuple[float, float]]:
         """
-        Geocodifica múltiplos endereços
+        Geocodifica múltiplos endereços em paralelo
+        
+        As requisições são I/O-bound e compartilham a sessão (pool de até
+        32 conexões), então até 8 endereços são resolvidos ao mesmo tempo.
+        O rate limiting (429) é tratado pelo backoff do adapter da sessão.
         
         Args:
             addresses: Lista de endereços
@@ -116,17 +98,18 @@ class ORSGeocodingService:
         """
         results = {}
         
-        for address in addresses:
-            try:
-                coords = self.geocode(address)
-                results[address] = coords
-                # Pequeno delay para evitar rate limiting
-                time.sleep(0.5)
-            except Exception as e:
-                results[address] = None
-                print(f"Erro ao geocodificar '{address}': {str(e)}")
-        
-        return results
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {executor.submit(self.geocode, address): address for address in addresses}
+            for future in as_completed(futures):
+                address = futures[future]
+                try:
+                    results[address] = future.result()
+                except Exception as e:
+                    results[address] = None
+                    print(f"Erro ao geocodificar '{address}': {str(e)}")
+        
+        # Mantém a ordem da lista de entrada
+        return {address: results[address] for address in addresses}
     
     def geocode_with_state(self, address: str, timeout: int = 10):
         """
@@ -134,7 +117,7 @@ class ORSGeocodingService:
 
         Utiliza a resposta GeoJSON do ORS para ler os campos `region` ou
         `region_a` de `features[0]['properties']`, que tipicamente contêm
-        o nome do estado brasileiro.
+        o nome do estado brasileiro. Compartilha o cache de geocode().
 
         Args:
             address: Endereço a ser geocodificado
@@ -154,10 +137,19 @@ class ORSGeocodingService:
         if not address or not address.strip():
             raise ValueError("Endereço não pode estar vazio")
 
+        return _search_cached(self.api_key, _normalize_address(address), timeout)
+
+    def _search(self, address: str, timeout: int = 10) -> Tuple[float, float, Optional[str]]:
+        """
+        Requisição de geocoding propriamente dita (sem cache)
+
+        Returns:
+            Tuple (latitude, longitude, estado_uf_raw) do melhor resultado
+        """
         try:
             params = {
-                'text': address.strip(),
-                'size': 1
+                'text': address,
+                'size': 1  # Retornar apenas o melhor resultado
             }
             if self.api_key:
                 params['api_key'] = self.api_key
@@ -165,17 +157,17 @@ class ORSGeocodingService:
             response = self.session.get(
                 self.base_url,
                 params=params,
+                headers=self.headers,
                 timeout=timeout
             )
 
-            if response.status_code == 401:
-                raise ConnectionError("API key inválida ou não autorizada")
-            elif response.status_code == 429:
-                raise ConnectionError("Limite de requisições excedido. Aguarde alguns minutos.")
-            elif response.status_code != 200:
-                raise ConnectionError(f"Erro na API: Status {response.status_code}")
+            if response.status_code != 200:
+                raise ConnectionError(_GEOCODE_ERRORS.get(
+                    response.status_code,
+                    f"Erro na API: Status {response.status_code}"
+                ))
 
-            data = response.json()
+            data = _loads(response.content)
 
             if not data.get('features') or len(data['features']) == 0:
                 raise ValueError(f"Endereço não encontrado: '{address}'")
@@ -204,6 +196,9 @@ class ORSGeocodingService:
         """
         Reverse geocoding: converte coordenadas em nome do local
         
+        As coordenadas são arredondadas para 4 casas decimais (~11 m) e o
+        resultado é cacheado (LRU) por esse ponto.
+        
         Args:
             lat: Latitude
             lon: Longitude
@@ -213,29 +208,137 @@ class ORSGeocodingService:
             Nome do local encontrado
         """
         try:
-            url = "https://api.openrouteservice.org/geocode/reverse"
-            
-            params = {
-                'point.lat': lat,
-                'point.lon': lon,
-                'size': 1
-            }
-            
-            if self.api_key:
-                params['api_key'] = self.api_key
-            
-            response = self.session.get(url, params=params, timeout=timeout)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('features') and len(data['features']) > 0:
-                return data['features'][0]['properties'].get('label', 'Local desconhecido')
-            
-            return f"Coordenadas: {lat:.4f}, {lon:.4f}"
-            
+            return _reverse_cached(self.api_key, round(lat, 4), round(lon, 4), timeout)
         except Exception as e:
             return f"Coordenadas: {lat:.4f}, {lon:.4f}"
+    
+    def _reverse(self, lat: float, lon: float, timeout: int = 10) -> str:
+        """Requisição de reverse geocoding propriamente dita (sem cache)"""
+        url = f"{ORS_BASE_URL}/geocode/reverse"
+        
+        params = {
+            'point.lat': lat,
+            'point.lon': lon,
+            'size': 1
+        }
+        
+        if self.api_key:
+            params['api_key'] = self.api_key
+        
+        response = self.session.get(url, params=params, headers=self.headers, timeout=timeout)
+        response.raise_for_status()
+        
+        data = _loads(response.content)
+        
+        if data.get('features') and len(data['features']) > 0:
+            return data['features'][0]['properties'].get('label', 'Local desconhecido')
+        
+        return f"Coordenadas: {lat:.4f}, {lon:.4f}"
+
+
+# Mensagem de erro por status HTTP da API de geocoding
+_GEOCODE_ERRORS = {
+    401: "API key inválida ou não autorizada",
+    429: "Limite de requisições excedido. Aguarde alguns minutos.",
+}
+
+
+def _normalize_address(address: str) -> str:
+    """Normaliza o endereço para a chave do cache (minúsculas, espaços colapsados)"""
+    return " ".join(address.strip().lower().split())
+
+
+class _GeocodeDiskCache:
+    """
+    Cache persistente (sqlite) de geocoding com TTL, atrás do LRU em memória
+
+    A conexão é aberta sob demanda e compartilhada entre threads (acesso
+    serializado por um lock). Se o arquivo não puder ser criado/aberto, o
+    cache fica desativado e o geocoding segue só com o LRU.
+    """
+
+    def __init__(self, path: str, ttl: int):
+        self.path = os.path.expanduser(path) if path else ""
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = not self.path
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS geo("
+                    "k TEXT PRIMARY KEY, lat REAL, lon REAL, state TEXT, ts INTEGER)"
+                )
+                conn.commit()
+                self._conn = conn
+            except (OSError, sqlite3.Error) as e:
+                print(f"Cache de geocoding desativado ({self.path}): {e}")
+                self._disabled = True
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[float, float, Optional[str]]]:
+        """Resultado ainda válido para a chave, ou None"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT lat, lon, state FROM geo WHERE k = ? AND ts > ?",
+                    (key, int(time.time()) - self.ttl)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        return tuple(row) if row else None
+
+    def put(self, key: str, value: Tuple[float, float, Optional[str]]) -> None:
+        """Grava (ou substitui) o resultado da chave, numa única transação"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO geo(k, lat, lon, state, ts) VALUES (?, ?, ?, ?, ?)",
+                        (key, value[0], value[1], value[2], int(time.time()))
+                    )
+            except sqlite3.Error:
+                pass
+
+
+_disk_cache = _GeocodeDiskCache(_CACHE_PATH, _CACHE_TTL)
+
+
+# Caches em memória compartilhados por todas as instâncias com a mesma API
+# key (o Streamlit reexecuta o script a cada interação). Exceções não são
+# cacheadas, então falhas são tentadas de novo na chamada seguinte.
+
+@lru_cache(maxsize=None)
+def _service_for(api_key: Optional[str]) -> ORSGeocodingService:
+    """Instância (e sessão HTTP) usada pelos caches para cada API key"""
+    return ORSGeocodingService(api_key=api_key)
+
+
+@lru_cache(maxsize=1024)
+def _search_cached(api_key: Optional[str], normalized_address: str, timeout: int):
+    """Geocoding cacheado por endereço normalizado (LRU, depois sqlite)"""
+    cached = _disk_cache.get(normalized_address)
+    if cached is not None:
+        return cached
+    result = _service_for(api_key)._search(normalized_address, timeout)
+    _disk_cache.put(normalized_address, result)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _reverse_cached(api_key: Optional[str], lat: float, lon: float, timeout: int) -> str:
+    """Reverse geocoding cacheado por ponto arredondado"""
+    return _service_for(api_key)._reverse(lat, lon, timeout)
 
 
 # Criar instância global usando a API key definida em config.py (se disponível)
@@ -153,40 +153,45 @@ def show_loading(message: str = "Processando..."):
     )
 
 
-def show_loading_with_vehicle(message: str = "Processando...", vehicle_type: str = "car"):
-    """
-    Exibe indicador de carregamento com ícone específico do veículo.
-
-    Args:
-        message: Mensagem a ser exibida
-        vehicle_type: Tipo de veículo ('car', 'motorcycle', 'truck')
-    """
-    vehicle_icons = {
-        'car': '🚗',
-        'motorcycle': '🏍️',
-        'truck': '🚛'
-    }
-    emoji = vehicle_icons.get(vehicle_type, '🚗')
-
-    st.markdown(
-        f"""
+def _render_loading_prefix(emoji: str) -> str:
+    """Abertura do indicador de carregamento (até o ícone do veículo)"""
+    return f"""
         <div style="display:flex; align-items:center; gap:12px;
                     padding:10px 16px; border-radius:8px;
                     background:#1e293b; color:#cbd5e1; font-size:15px;">
             <span style="font-size:22px;
                          animation:vehicle-bounce 0.6s ease-in-out infinite alternate;
                          display:inline-block;">{emoji}</span>
-            {message}
+            """
+
+
+_LOADING_SUFFIX = """
         </div>
         <style>
-            @keyframes vehicle-bounce {{
-                from {{ transform: translateX(-4px); }}
-                to   {{ transform: translateX( 4px); }}
-            }}
+            @keyframes vehicle-bounce {
+                from { transform: translateX(-4px); }
+                to   { transform: translateX( 4px); }
+            }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+# Montado uma vez na importação: o Streamlit reexecuta o script a cada interação
+_LOADING_PREFIX_BY_VEHICLE = {
+    vehicle: _render_loading_prefix(emoji)
+    for vehicle, emoji in {'car': '🚗', 'motorcycle': '🏍️', 'truck': '🚛'}.items()
+}
+
+
+def show_loading_with_vehicle(message: str = "Processando...", vehicle_type: str = "car"):
+    """
+    Exibe indicador de carregamento com ícone específico do veículo.
+
+    Args:
+        message: Mensagem a ser exibida
+        vehicle_type: Tipo de veículo ('car', 'motorcycle', 'truck')
+    """
+    prefix = _LOADING_PREFIX_BY_VEHICLE.get(vehicle_type, _LOADING_PREFIX_BY_VEHICLE['car'])
+    st.markdown(prefix + message + _LOADING_SUFFIX, unsafe_allow_html=True)
 
 
 
@@ -234,6 +239,63 @@ def show_info(message: str, icon: str = "ℹ️"):
     st.info(message, icon=icon)
 
 
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _summarize_route(route_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula os campos derivados exibidos no resumo da rota
+    
+    Cacheado pelo conteúdo de route_data, então as reexecuções do
+    Streamlit com a mesma rota só renderizam o resultado.
+    
+    Args:
+        route_data: Dados da rota
+        
+    Returns:
+        Dict com distância formatada, contagem de alertas, status, resumo
+        e as linhas (markdown, legenda de localização) de cada alerta
+    """
+    alerts = route_data.get('alerts', [])
+    alert_count = len(alerts)
+    
+    # Calcular status baseado em alertas
+    if alert_count == 0:
+        status = "✅ Livre"
+    elif alert_count <= 2:
+        status = "⚠️ Atenção"
+    else:
+        status = "🚨 Cuidado"
+    
+    alert_lines = []
+    for i, alert in enumerate(alerts, 1):
+        level = alert.get('level', 'yellow')
+        message = alert.get('message', 'Alerta')
+        location = alert.get('location', {})
+        
+        # Determinar ícone baseado no nível
+        if level == 'red':
+            icon = "🔴"
+        elif level == 'yellow':
+            icon = "🟡"
+        else:
+            icon = "🟢"
+        
+        caption = None
+        if location:
+            lat = location.get('lat', '')
+            lon = location.get('lon', '')
+            if lat and lon:
+                caption = f"Localização: {lat:.4f}, {lon:.4f}"
+        alert_lines.append((f"{icon} **Alerta {i}:** {message}", caption))
+    
+    return {
+        'distance': f"{route_data.get('distance_km', 0):.2f} km",
+        'alert_count': alert_count,
+        'status': status,
+        'summary': route_data.get('summary', ''),
+        'alert_lines': alert_lines
+    }
+
+
 def show_route_summary(route_data: Dict[str, Any], route_type: str):
     """
     Exibe resumo da rota calculada
@@ -248,6 +310,8 @@ def show_route_summary(route_data: Dict[str, Any], route_type: str):
         'safest': '🛡️ Rota Mais Segura',
         'truck_compatible': '🚛 Compatível com Caminhão'
     }
+    view = _summarize_route(route_data)
+    alert_count = view['alert_count']
     
     st.subheader(route_names.get(route_type, 'Rota'))
     
@@ -255,14 +319,9 @@ def show_route_summary(route_data: Dict[str, Any], route_type: str):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric(
-            "Distância",
-            f"{route_data.get('distance_km', 0):.2f} km"
-        )
+        st.metric("Distância", view['distance'])
     
     with col2:
-        alerts = route_data.get('alerts', [])
-        alert_count = len(alerts)
         st.metric(
             "Alertas",
             alert_count,
@@ -271,46 +330,19 @@ def show_route_summary(route_data: Dict[str, Any], route_type: str):
         )
     
     with col3:
-        # Calcular status baseado em alertas
-        if alert_count == 0:
-            status = "✅ Livre"
-            status_color = "green"
-        elif alert_count <= 2:
-            status = "⚠️ Atenção"
-            status_color = "orange"
-        else:
-            status = "🚨 Cuidado"
-            status_color = "red"
-        
-        st.markdown(f"**Status:** {status}")
+        st.markdown(f"**Status:** {view['status']}")
     
     # Resumo textual
-    summary = route_data.get('summary', '')
-    if summary:
-        st.info(summary)
+    if view['summary']:
+        st.info(view['summary'])
     
     # Mostrar alertas se houver
-    if alerts and len(alerts) > 0:
-        with st.expander(f"⚠️ Ver {len(alerts)} alerta(s)", expanded=False):
-            for i, alert in enumerate(alerts, 1):
-                level = alert.get('level', 'yellow')
-                message = alert.get('message', 'Alerta')
-                location = alert.get('location', {})
-                
-                # Determinar ícone baseado no nível
-                if level == 'red':
-                    icon = "🔴"
-                elif level == 'yellow':
-                    icon = "🟡"
-                else:
-                    icon = "🟢"
-                
-                st.markdown(f"{icon} **Alerta {i}:** {message}")
-                if location:
-                    lat = location.get('lat', '')
-                    lon = location.get('lon', '')
-                    if lat and lon:
-                        st.caption(f"Localização: {lat:.4f}, {lon:.4f}")
+    if alert_count > 0:
+        with st.expander(f"⚠️ Ver {alert_count} alerta(s)", expanded=False):
+            for line, caption in view['alert_lines']:
+                st.markdown(line)
+                if caption:
+                    st.caption(caption)
 
 
 def show_all_routes_comparison(routes: list):
@@ -1,9 +1,20 @@
 """
 Utilitários para criação e estilização de mapas Folium
+
+O folium (e com ele jinja2/branca) só é importado quando um mapa é de fato
+montado, para não pesar na inicialização de quem só usa as constantes.
 """
 
-import folium
-from typing import List, Tuple, Dict, Any, Optional
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+import numpy as np
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Optional, Set, Union
+
+if TYPE_CHECKING:
+    import folium
 
 
 # Definição de cores para diferentes critérios de rota
@@ -22,37 +33,191 @@ ALERT_COLORS = {
 }
 
 
+# Nomes exibidos de cada critério de rota
+ROUTE_NAMES = {
+    'fastest': 'Rota Mais Rápida',
+    'best_surface': 'Melhor Pavimento',
+    'safest': 'Rota Mais Segura',
+    'truck_compatible': 'Compatível com Caminhão'
+}
+
+
+def _render_popup_header(color: str, name: str) -> str:
+    """Cabeçalho do popup da rota, com distância (%.2f) e alertas (%d) em aberto"""
+    color = color.replace('%', '%%')
+    name = name.replace('%', '%%')
+    return f"""
+    <div style="font-family: Arial, sans-serif;">
+        <h4 style="margin: 0 0 10px 0; color: {color};">
+            {name}
+        </h4>
+        <p style="margin: 5px 0;"><strong>Distância:</strong> %.2f km</p>
+        <p style="margin: 5px 0;"><strong>Alertas:</strong> %d</p>
+    """
+
+
+# (cabeçalho do popup, rótulo do tooltip) por tipo de rota, montados uma vez
+POPUP_TEMPLATES = {
+    route_type: (_render_popup_header(ROUTE_COLORS[route_type], name), name)
+    for route_type, name in ROUTE_NAMES.items()
+}
+
+# Abertura da seção de avisos do popup (até a lista <ul>)
+_ALERTS_SECTION_OPEN = (
+    "<hr style='margin: 10px 0;'>"
+    "<p style='margin: 5px 0;'><strong>Avisos:</strong></p>"
+    "<ul style='margin: 5px 0; padding-left: 20px;'>"
+)
+
+# Camadas de tiles do mapa base
+ESRI_IMAGERY_TILES = 'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}'
+ESRI_IMAGERY_ATTR = (
+    'Tiles &copy; Esri &mdash; Source: Esri, i-cubed, USDA, USGS, AEX, GeoEye, '
+    'Getmapping, Aerogrid, IGN, IGP, UPR-EGP, and the GIS User Community'
+)
+STADIA_TONER_TILES = 'https://tiles.stadiamaps.com/tiles/stamen_toner_blacklite/{z}/{x}/{y}{r}.png'
+STADIA_TONER_ATTR = (
+    '&copy; <a href="https://www.stadiamaps.com/" target="_blank">Stadia Maps</a> '
+    '&copy; <a href="https://www.stamen.com/" target="_blank">Stamen Design</a> '
+    '&copy; <a href="https://openmaptiles.org/" target="_blank">OpenMapTiles</a> '
+    '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+)
+
+
+# Acima desse número de alertas a camada de alertas começa desligada
+ALERT_LAYER_MAX_VISIBLE = 200
+
+# Tolerância padrão da simplificação de rotas (~1 m; abaixo de um pixel nos zooms 12–14)
+DEFAULT_SIMPLIFY_TOLERANCE = 1e-5
+
+
+def simplify_coords(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplifica uma polilinha com Ramer–Douglas–Peucker
+    
+    Args:
+        coords: Array (n, 2) de coordenadas
+        tolerance: Distância máxima (nas unidades das coordenadas, graus)
+            entre a linha original e a simplificada
+        
+    Returns:
+        Array (m, 2) com os vértices mantidos, na ordem original
+        (primeiro e último sempre incluídos)
+    """
+    n = len(coords)
+    if tolerance <= 0 or n < 3:
+        return coords
+    
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        
+        # Distância perpendicular dos vértices internos ao segmento start-end
+        origin = coords[start]
+        direction = coords[end] - origin
+        offsets = coords[start + 1:end] - origin
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            dists = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            dists = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        
+        farthest = int(np.argmax(dists))
+        if dists[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    
+    return coords[keep]
+
+
+def route_bounds(
+    geometry: List[List[float]],
+    padding: float = 0.1
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Bounding box da geometria de uma rota, com margem
+    
+    Args:
+        geometry: Lista de coordenadas [[lon, lat], [lon, lat], ...]
+        padding: Margem em cada lado, como fração da extensão da rota
+        
+    Returns:
+        Tuple (lat_min, lon_min, lat_max, lon_max), ou None se a geometria
+        estiver vazia
+    """
+    points = np.asarray(geometry, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return None
+    lon_min, lat_min = points.min(axis=0)
+    lon_max, lat_max = points.max(axis=0)
+    pad_lat = (lat_max - lat_min) * padding
+    pad_lon = (lon_max - lon_min) * padding
+    return (
+        float(lat_min - pad_lat), float(lon_min - pad_lon),
+        float(lat_max + pad_lat), float(lon_max + pad_lon)
+    )
+
+
 def create_base_map(
     center_lat: float,
     center_lon: float,
-    zoom_start: int = 13
+    zoom_start: int = 13,
+    prefer_canvas: bool = True
 ) -> folium.Map:
     """
     Cria um mapa base Folium
     
+    O mapa é uma cópia de um modelo cacheado por centro (arredondado a
+    ~100 m) e zoom, então as camadas de tiles não são recriadas a cada
+    requisição e o chamador pode alterar o mapa livremente.
+    
     Args:
         center_lat: Latitude do centro do mapa
         center_lon: Longitude do centro do mapa
         zoom_start: Nível de zoom inicial
+        prefer_canvas: Desenhar linhas e marcadores circulares num único
+            <canvas> em vez de um nó SVG por elemento (bem mais leve para
+            rotas densas; perde apenas estilização de paths via CSS)
         
     Returns:
         Objeto folium.Map configurado
     """
+    template = _base_map_template(
+        round(center_lat, 3), round(center_lon, 3), zoom_start, prefer_canvas
+    )
+    return copy.deepcopy(template)
+
+
+@lru_cache(maxsize=128)
+def _base_map_template(
+    center_lat: float,
+    center_lon: float,
+    zoom_start: int,
+    prefer_canvas: bool
+) -> folium.Map:
+    """Modelo do mapa base (nunca devolvido diretamente: ver create_base_map)"""
+    import folium
+    
     # Criar mapa sem tile padrão para controlar a camada ativa manualmente
     m = folium.Map(
         location=[center_lat, center_lon],
         zoom_start=zoom_start,
         tiles=None,
-        control_scale=True
+        control_scale=True,
+        prefer_canvas=prefer_canvas
     )
     
     # Adicionar Esri.WorldImagery
     folium.TileLayer(
-        tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-        attr=(
-            'Tiles &copy; Esri &mdash; Source: Esri, i-cubed, USDA, USGS, AEX, GeoEye, '
-            'Getmapping, Aerogrid, IGN, IGP, UPR-EGP, and the GIS User Community'
-        ),
+        tiles=ESRI_IMAGERY_TILES,
+        attr=ESRI_IMAGERY_ATTR,
         name='Esri World Imagery',
         overlay=False,
         control=True
@@ -60,13 +225,8 @@ def create_base_map(
 
     # Adicionar Stadia.StamenTonerBlacklite
     folium.TileLayer(
-        tiles='https://tiles.stadiamaps.com/tiles/stamen_toner_blacklite/{z}/{x}/{y}{r}.png',
-        attr=(
-            '&copy; <a href="https://www.stadiamaps.com/" target="_blank">Stadia Maps</a> '
-            '&copy; <a href="https://www.stamen.com/" target="_blank">Stamen Design</a> '
-            '&copy; <a href="https://openmaptiles.org/" target="_blank">OpenMapTiles</a> '
-            '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
-        ),
+        tiles=STADIA_TONER_TILES,
+        attr=STADIA_TONER_ATTR,
         name='Stadia Toner Blacklite',
         overlay=False,
         control=True,
@@ -82,9 +242,8 @@ def create_base_map(
         control=True
     ).add_to(m)
     
-    # Adicionar controle de camadas
-    folium.LayerControl().add_to(m)
-    
+    # O LayerControl é adicionado por quem monta o mapa, depois de todas as
+    # camadas: o JS do controle referencia as variáveis das camadas
     return m
 
 
@@ -112,6 +271,8 @@ def add_marker(
     Returns:
         Mapa atualizado
     """
+    import folium
+    
     folium.Marker(
         location=[lat, lon],
         popup=folium.Popup(popup_text, max_width=300),
@@ -122,13 +283,86 @@ def add_marker(
     return map_obj
 
 
+def route_coordinates(
+    geometry: List[List[float]],
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE
+) -> List[List[float]]:
+    """
+    Converte a geometria da API na lista de pontos usada pelo Folium
+    
+    Args:
+        geometry: Lista de coordenadas [[lon, lat], [lon, lat], ...]
+        simplify_tolerance: Tolerância (graus) da simplificação da linha;
+            0 mantém todos os vértices
+        
+    Returns:
+        Lista de coordenadas [[lat, lon], ...] simplificada
+    """
+    # Simplificar a linha e converter de [lon, lat] para [lat, lon]
+    # (troca de colunas vetorizada)
+    points = simplify_coords(
+        np.asarray(geometry, dtype=np.float64).reshape(-1, 2), simplify_tolerance
+    )
+    return points[:, ::-1].tolist()
+
+
+@lru_cache(maxsize=512)
+def _build_popup_html(
+    route_type: str,
+    distance_km: float,
+    alerts_key: Tuple[Tuple[str, str], ...],
+    nalerts: int,
+    popup_info: Optional[str]
+) -> str:
+    """
+    Monta o HTML do popup de uma rota
+    
+    Args:
+        route_type: Tipo da rota
+        distance_km: Distância em km (já arredondada a 2 casas)
+        alerts_key: (nível, mensagem) dos alertas exibidos (até 3)
+        nalerts: Total de alertas da rota
+        popup_info: Informações adicionais para o popup
+        
+    Returns:
+        HTML do popup
+    """
+    # Cabeçalho pré-montado do tipo de rota
+    template = POPUP_TEMPLATES.get(route_type)
+    if template is None:
+        color = ROUTE_COLORS.get(route_type, '#666666')
+        template = (_render_popup_header(color, route_type.title()), route_type.title())
+    header = template[0]
+    
+    # Fragmentos do popup acumulados numa lista e unidos uma única vez
+    parts = [header % (distance_km, nalerts)]
+    
+    if popup_info:
+        parts.append(f"<p style='margin: 5px 0;'>{popup_info}</p>")
+    
+    # Adicionar informações de alertas
+    if nalerts:
+        parts.append(_ALERTS_SECTION_OPEN)
+        parts.append("".join(
+            f"<li style='color: {ALERT_COLORS.get(level, '#000')};'>{message}</li>"
+            for level, message in alerts_key
+        ))
+        if nalerts > 3:
+            parts.append(f"<li>... e mais {nalerts - 3} alertas</li>")
+        parts.append("</ul>")
+    
+    parts.append("</div>")
+    return "".join(parts)
+
+
 def add_route_line(
     map_obj: folium.Map,
     geometry: List[List[float]],
     route_type: str,
     distance_km: float,
     alerts: List[Dict[str, Any]],
-    popup_info: Optional[str] = None
+    popup_info: Optional[str] = None,
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE
 ) -> folium.Map:
     """
     Adiciona uma linha de rota ao mapa
@@ -140,56 +374,35 @@ def add_route_line(
         distance_km: Distância em km
         alerts: Lista de alertas da rota
         popup_info: Informações adicionais para o popup
+        simplify_tolerance: Tolerância (graus) da simplificação da linha;
+            0 envia todos os vértices
         
     Returns:
         Mapa atualizado
     """
-    # Converter geometria de [lon, lat] para [lat, lon]
-    coordinates = [[point[1], point[0]] for point in geometry]
+    import folium
+    
+    coordinates = route_coordinates(geometry, simplify_tolerance)
     
     # Determinar cor baseada no tipo de rota
     color = ROUTE_COLORS.get(route_type, '#666666')
+    nalerts = len(alerts) if alerts else 0
     
     # Definir peso da linha baseado em alertas
     weight = 5
-    if alerts and len(alerts) > 0:
+    if nalerts:
         # Linhas com alertas são mais grossas para destaque
         weight = 6
     
-    # Criar texto do popup
-    route_names = {
-        'fastest': 'Rota Mais Rápida',
-        'best_surface': 'Melhor Pavimento',
-        'safest': 'Rota Mais Segura',
-        'truck_compatible': 'Compatível com Caminhão'
-    }
-    
-    popup_html = f"""
-    <div style="font-family: Arial, sans-serif;">
-        <h4 style="margin: 0 0 10px 0; color: {color};">
-            {route_names.get(route_type, route_type.title())}
-        </h4>
-        <p style="margin: 5px 0;"><strong>Distância:</strong> {distance_km:.2f} km</p>
-        <p style="margin: 5px 0;"><strong>Alertas:</strong> {len(alerts)}</p>
-    """
-    
-    if popup_info:
-        popup_html += f"<p style='margin: 5px 0;'>{popup_info}</p>"
-    
-    # Adicionar informações de alertas
-    if alerts and len(alerts) > 0:
-        popup_html += "<hr style='margin: 10px 0;'>"
-        popup_html += "<p style='margin: 5px 0;'><strong>Avisos:</strong></p>"
-        popup_html += "<ul style='margin: 5px 0; padding-left: 20px;'>"
-        for alert in alerts[:3]:  # Mostrar até 3 alertas
-            level = alert.get('level', 'yellow')
-            message = alert.get('message', 'Alerta')
-            popup_html += f"<li style='color: {ALERT_COLORS.get(level, '#000')};'>{message}</li>"
-        if len(alerts) > 3:
-            popup_html += f"<li>... e mais {len(alerts) - 3} alertas</li>"
-        popup_html += "</ul>"
-    
-    popup_html += "</div>"
+    # Criar texto do popup (cacheado pelo conteúdo que aparece nele)
+    alerts_key = tuple(
+        (alert.get('level', 'yellow'), alert.get('message', 'Alerta'))
+        for alert in alerts[:3]  # Mostrar até 3 alertas
+    ) if nalerts else ()
+    popup_html = _build_popup_html(
+        route_type, round(distance_km, 2), alerts_key, nalerts, popup_info
+    )
+    label = ROUTE_NAMES.get(route_type, route_type.title())
     
     # Adicionar linha ao mapa
     folium.PolyLine(
@@ -198,58 +411,110 @@ def add_route_line(
         weight=weight,
         opacity=0.8,
         popup=folium.Popup(popup_html, max_width=300),
-        tooltip=f"{route_names.get(route_type, route_type.title())} - {distance_km:.2f} km"
+        tooltip=f"{label} - {distance_km:.2f} km"
     ).add_to(map_obj)
     
     return map_obj
 
 
+@dataclass(slots=True)
+class Alert:
+    """Alerta de rota já localizado, pronto para virar marcador"""
+    lat: float
+    lon: float
+    level: str = 'yellow'
+    message: str = 'Alerta'
+
+
+def parse_alerts(alerts: List[Dict[str, Any]]) -> List[Alert]:
+    """
+    Converte os alertas da API (dicts) em Alert
+    
+    Alertas sem localização (ou sem lat/lon) são descartados.
+    
+    Args:
+        alerts: Lista de alertas como retornados pelo back-end
+        
+    Returns:
+        Lista de Alert, na mesma ordem
+    """
+    parsed = []
+    for alert in alerts:
+        location = alert.get('location')
+        if not location:
+            continue
+        lat = location.get('lat')
+        lon = location.get('lon')
+        if lat is None or lon is None:
+            continue
+        parsed.append(Alert(
+            lat, lon, alert.get('level', 'yellow'), alert.get('message', 'Alerta')
+        ))
+    return parsed
+
+
 def add_alert_markers(
     map_obj: folium.Map,
-    alerts: List[Dict[str, Any]]
+    alerts: List[Union[Alert, Dict[str, Any]]],
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    seen: Optional[Set[Tuple[float, float, str]]] = None,
+    feature_group: Optional[folium.FeatureGroup] = None
 ) -> folium.Map:
     """
     Adiciona marcadores de alerta no mapa
     
     Args:
         map_obj: Objeto do mapa
-        alerts: Lista de alertas com informações de localização
+        alerts: Lista de Alert (ver parse_alerts); dicts da API também são
+            aceitos e convertidos aqui
+        bounds: (lat_min, lon_min, lat_max, lon_max) da rota (ver
+            route_bounds); alertas fora dessa área não são desenhados
+        seen: Chaves (lat, lon, mensagem) já desenhadas, compartilhadas entre
+            chamadas para não repetir o mesmo alerta de rotas sobrepostas;
+            é atualizado com os alertas adicionados
+        feature_group: Camada que recebe os marcadores; por padrão é criada
+            uma camada "Alertas", desligada se houver ALERT_LAYER_MAX_VISIBLE
+            alertas ou mais
         
     Returns:
         Mapa atualizado
     """
+    import folium
+    
+    if not alerts:
+        return map_obj
+    if isinstance(alerts[0], dict):
+        alerts = parse_alerts(alerts)
+    
+    if feature_group is None:
+        feature_group = folium.FeatureGroup(
+            name='Alertas', show=len(alerts) < ALERT_LAYER_MAX_VISIBLE
+        ).add_to(map_obj)
+    
     for alert in alerts:
-        location = alert.get('location')
-        if not location:
+        lat = alert.lat
+        lon = alert.lon
+        if bounds and not (bounds[0] <= lat <= bounds[2] and bounds[1] <= lon <= bounds[3]):
             continue
-        
-        lat = location.get('lat')
-        lon = location.get('lon')
-        level = alert.get('level', 'yellow')
-        message = alert.get('message', 'Alerta')
-        
-        # Determinar cor e ícone baseado no nível
-        if level == 'red':
-            color = 'red'
-            icon = 'exclamation-sign'
-        elif level == 'yellow':
-            color = 'orange'
-            icon = 'warning-sign'
-        else:
-            color = 'green'
-            icon = 'info-sign'
+        message = alert.message
+        if seen is not None:
+            key = (round(lat, 6), round(lon, 6), message)
+            if key in seen:
+                continue
+            seen.add(key)
         
         # Adicionar marcador circular
+        fill = ALERT_COLORS[alert.level]
         folium.CircleMarker(
             location=[lat, lon],
             radius=8,
             popup=message,
             tooltip=message,
-            color=ALERT_COLORS[level],
+            color=fill,
             fill=True,
-            fillColor=ALERT_COLORS[level],
+            fillColor=fill,
             fillOpacity=0.6
-        ).add_to(map_obj)
+        ).add_to(feature_group)
     
     return map_obj
 
@@ -261,7 +526,9 @@ def create_route_map(
     dest_lon: float,
     routes: List[Dict[str, Any]],
     origin_name: str = "Origem",
-    dest_name: str = "Destino"
+    dest_name: str = "Destino",
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    merge_routes: bool = False
 ) -> folium.Map:
     """
     Cria um mapa completo com origem, destino e múltiplas rotas
@@ -274,13 +541,27 @@ def create_route_map(
         routes: Lista de rotas calculadas
         origin_name: Nome da origem
         dest_name: Nome do destino
+        simplify_tolerance: Tolerância (graus) da simplificação das linhas
+        merge_routes: Se True, desenha as rotas de mesma cor numa única
+            PolyLine (multilinha, sem popup) e deixa as linhas individuais,
+            com popup, numa camada "Detalhes das rotas" desligada por padrão
         
     Returns:
         Mapa Folium completo
     """
-    # Calcular ponto central entre origem e destino
-    center_lat = (origin_lat + dest_lat) / 2
-    center_lon = (origin_lon + dest_lon) / 2
+    import folium
+    
+    # Bounding box de origem, destino e todas as geometrias ([lat, lon]);
+    # o centro do mapa é o centro dessa caixa, não só o dos extremos
+    points = np.concatenate([
+        np.array([[origin_lat, origin_lon], [dest_lat, dest_lon]], dtype=np.float64)
+    ] + [
+        np.asarray(route['geometry'], dtype=np.float64).reshape(-1, 2)[:, ::-1]
+        for route in routes if route.get('geometry')
+    ])
+    south_west = points.min(axis=0)
+    north_east = points.max(axis=0)
+    center_lat, center_lon = ((south_west + north_east) / 2).tolist()
     
     # Criar mapa base
     m = create_base_map(center_lat, center_lon, zoom_start=12)
@@ -303,7 +584,23 @@ def create_route_map(
         color='red'
     )
     
-    # Adicionar rotas
+    # Linhas individuais vão direto no mapa ou, ao mesclar, numa camada oculta
+    route_layer = m
+    merged_lines: Dict[str, List[List[List[float]]]] = {}
+    if merge_routes:
+        route_layer = folium.FeatureGroup(name='Detalhes das rotas', show=False).add_to(m)
+    
+    # Uma única camada de alertas para todas as rotas, desligada se forem muitos
+    # (só existe se houver alertas, para não deixar um item vazio no controle)
+    alert_count = sum(len(route.get('alerts') or []) for route in routes)
+    alert_layer = None
+    if alert_count > 0:
+        alert_layer = folium.FeatureGroup(
+            name='Alertas', show=alert_count < ALERT_LAYER_MAX_VISIBLE
+        ).add_to(m)
+    
+    # Adicionar rotas (alertas compartilhados entre rotas são desenhados uma vez)
+    seen_alerts = set()
     for route in routes:
         geometry = route.get('geometry', [])
         route_type = route.get('type', 'unknown')
@@ -313,22 +610,68 @@ def create_route_map(
         
         if geometry:
             add_route_line(
-                m, geometry, route_type, distance_km, alerts, summary
+                route_layer, geometry, route_type, distance_km, alerts, summary,
+                simplify_tolerance
             )
+            if merge_routes:
+                color = ROUTE_COLORS.get(route_type, '#666666')
+                merged_lines.setdefault(color, []).append(
+                    route_coordinates(geometry, simplify_tolerance)
+                )
             
-            # Adicionar marcadores de alerta
+            # Adicionar marcadores de alerta (só os próximos da rota)
             if alerts:
-                add_alert_markers(m, alerts)
+                add_alert_markers(
+                    m, parse_alerts(alerts), route_bounds(geometry), seen_alerts, alert_layer
+                )
+    
+    # Uma multilinha por cor: uma camada no Leaflet para todas as rotas da cor
+    for color, lines in merged_lines.items():
+        folium.PolyLine(locations=lines, color=color, weight=5, opacity=0.8).add_to(m)
+    
+    # Adicionar controle de camadas (por último, depois de todas as camadas)
+    folium.LayerControl().add_to(m)
     
     # Ajustar zoom para incluir todos os pontos
     try:
-        m.fit_bounds([[origin_lat, origin_lon], [dest_lat, dest_lon]])
+        m.fit_bounds([south_west.tolist(), north_east.tolist()])
     except:
         pass  # Se falhar, manter zoom padrão
     
     return m
 
 
+def render_route_map_html(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    routes: List[Dict[str, Any]],
+    origin_name: str = "Origem",
+    dest_name: str = "Destino"
+) -> str:
+    """
+    Renderiza o mapa de rotas como documento HTML completo
+    
+    Mesmo HTML que o streamlit_folium gera a partir do folium.Map, mas como
+    string: pode ser cacheada e exibida direto, sem reconstruir o grafo de
+    objetos do Folium nem renderizar os templates Jinja a cada exibição.
+    
+    Args:
+        Os mesmos de create_route_map
+        
+    Returns:
+        HTML do mapa
+    """
+    import folium
+    
+    route_map = create_route_map(
+        origin_lat, origin_lon, dest_lat, dest_lon,
+        routes, origin_name, dest_name
+    )
+    return folium.Figure().add_child(route_map).render()
+
+
 def create_simple_route_map(
     origin_lat: float,
     origin_lon: float,
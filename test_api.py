@@ -5,29 +5,48 @@ This script demonstrates how to use the routing API with different scenarios.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import io
 import json
+import sys
 
 
 BASE_URL = "http://localhost:8000"
 
+# Shared keep-alive session: every request reuses the pooled connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
-def test_health():
+# Pass --verbose to pretty-print full payloads instead of truncating them
+VERBOSE = "--verbose" in sys.argv
+
+
+def short_json(data, max_len=400):
+    """Compact JSON of data, cut at max_len characters unless VERBOSE"""
+    if VERBOSE:
+        return json.dumps(data, indent=2)
+    text = json.dumps(data)
+    return text if len(text) < max_len else text[:max_len] + "..."
+
+
+def test_health(out=sys.stdout):
     """Test health endpoint"""
-    print("=" * 60)
-    print("Testing Health Endpoint")
-    print("=" * 60)
-    
-    response = requests.get(f"{BASE_URL}/route/health")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    print("=" * 60, file=out)
+    print("Testing Health Endpoint", file=out)
+    print("=" * 60, file=out)
+    
+    response = SESSION.get(f"{BASE_URL}/route/health")
+    print(f"Status: {response.status_code}", file=out)
+    print(f"Response: {short_json(response.json())}", file=out)
+    print(file=out)
 
 
-def test_route_with_coordinates():
+def test_route_with_coordinates(out=sys.stdout):
     """Test routing with coordinates (Natal, RN area)"""
-    print("=" * 60)
-    print("Test 1: Routing with Coordinates (Natal, RN)")
-    print("=" * 60)
+    print("=" * 60, file=out)
+    print("Test 1: Routing with Coordinates (Natal, RN)", file=out)
+    print("=" * 60, file=out)
     
     # UFRN area to Ponta Negra
     request_data = {
@@ -44,47 +63,47 @@ def test_route_with_coordinates():
         }
     }
     
-    print(f"Request: {json.dumps(request_data, indent=2)}")
-    print("\nSending request...")
+    print(f"Request: {short_json(request_data)}", file=out)
+    print("\nSending request...", file=out)
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/route/calculate",
             json=request_data,
             timeout=120
         )
         
-        print(f"Status: {response.status_code}")
+        print(f"Status: {response.status_code}", file=out)
         
         if response.status_code == 200:
             data = response.json()
-            print(f"\nFound {len(data['routes'])} routes:")
+            print(f"\nFound {len(data['routes'])} routes:", file=out)
             
             for route in data['routes']:
-                print(f"\n  Type: {route['type']}")
-                print(f"  Distance: {route['distance_km']} km")
-                print(f"  Geometry points: {len(route['geometry'])}")
-                print(f"  Alerts: {len(route['alerts'])}")
-                print(f"  Summary: {route['summary']}")
+                print(f"\n  Type: {route['type']}", file=out)
+                print(f"  Distance: {route['distance_km']} km", file=out)
+                print(f"  Geometry points: {len(route['geometry'])}", file=out)
+                print(f"  Alerts: {len(route['alerts'])}", file=out)
+                print(f"  Summary: {route['summary']}", file=out)
                 
                 if route['alerts']:
-                    print("  Alert details:")
+                    print("  Alert details:", file=out)
                     for alert in route['alerts'][:3]:  # Show first 3
-                        print(f"    - [{alert['level']}] {alert['message']}")
+                        print(f"    - [{alert['level']}] {alert['message']}", file=out)
         else:
-            print(f"Error: {response.text}")
+            print(f"Error: {response.text}", file=out)
             
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
     
-    print()
+    print(file=out)
 
 
-def test_route_with_truck():
+def test_route_with_truck(out=sys.stdout):
     """Test routing with truck restrictions"""
-    print("=" * 60)
-    print("Test 2: Routing with Truck (Height/Weight Restrictions)")
-    print("=" * 60)
+    print("=" * 60, file=out)
+    print("Test 2: Routing with Truck (Height/Weight Restrictions)", file=out)
+    print("=" * 60, file=out)
     
     request_data = {
         "origin": {
@@ -102,41 +121,41 @@ def test_route_with_truck():
         }
     }
     
-    print(f"Request: {json.dumps(request_data, indent=2)}")
-    print("\nSending request...")
+    print(f"Request: {short_json(request_data)}", file=out)
+    print("\nSending request...", file=out)
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/route/calculate",
             json=request_data,
             timeout=120
         )
         
-        print(f"Status: {response.status_code}")
+        print(f"Status: {response.status_code}", file=out)
         
         if response.status_code == 200:
             data = response.json()
-            print(f"\nFound {len(data['routes'])} routes:")
+            print(f"\nFound {len(data['routes'])} routes:", file=out)
             
             # Should include truck_compatible route
             for route in data['routes']:
-                print(f"\n  Type: {route['type']}")
-                print(f"  Distance: {route['distance_km']} km")
-                print(f"  Summary: {route['summary']}")
+                print(f"\n  Type: {route['type']}", file=out)
+                print(f"  Distance: {route['distance_km']} km", file=out)
+                print(f"  Summary: {route['summary']}", file=out)
         else:
-            print(f"Error: {response.text}")
+            print(f"Error: {response.text}", file=out)
             
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
     
-    print()
+    print(file=out)
 
 
-def test_route_with_address():
+def test_route_with_address(out=sys.stdout):
     """Test routing with address geocoding"""
-    print("=" * 60)
-    print("Test 3: Routing with Addresses (Geocoding)")
-    print("=" * 60)
+    print("=" * 60, file=out)
+    print("Test 3: Routing with Addresses (Geocoding)", file=out)
+    print("=" * 60, file=out)
     
     request_data = {
         "origin": "UFRN, Natal, RN, Brazil",
@@ -146,31 +165,31 @@ def test_route_with_address():
         }
     }
     
-    print(f"Request: {json.dumps(request_data, indent=2)}")
-    print("\nSending request (this may take longer due to geocoding)...")
+    print(f"Request: {short_json(request_data)}", file=out)
+    print("\nSending request (this may take longer due to geocoding)...", file=out)
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/route/calculate",
             json=request_data,
             timeout=120
         )
         
-        print(f"Status: {response.status_code}")
+        print(f"Status: {response.status_code}", file=out)
         
         if response.status_code == 200:
             data = response.json()
-            print(f"\nGeocoded coordinates:")
-            print(f"  Origin: {data['origin_coords']}")
-            print(f"  Destination: {data['destination_coords']}")
-            print(f"\nFound {len(data['routes'])} routes")
+            print(f"\nGeocoded coordinates:", file=out)
+            print(f"  Origin: {data['origin_coords']}", file=out)
+            print(f"  Destination: {data['destination_coords']}", file=out)
+            print(f"\nFound {len(data['routes'])} routes", file=out)
         else:
-            print(f"Error: {response.text}")
+            print(f"Error: {response.text}", file=out)
             
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
     
-    print()
+    print(file=out)
 
 
 if __name__ == "__main__":
@@ -180,13 +199,19 @@ if __name__ == "__main__":
     print("╚" + "═" * 58 + "╝")
     print("\nMake sure the server is running: uvicorn app.main:app --reload\n")
     
-    # Run tests
-    test_health()
-    test_route_with_coordinates()
-    test_route_with_truck()
+    tests = [test_health, test_route_with_coordinates, test_route_with_truck]
     
     # Uncomment to test with addresses (requires internet for geocoding)
-    # test_route_with_address()
+    # tests.append(test_route_with_address)
+    
+    # Run tests concurrently; each one writes its report to its own buffer,
+    # printed whole as soon as the test finishes
+    buffers = {test: io.StringIO() for test in tests}
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = {executor.submit(test, buffers[test]): test for test in tests}
+        for future in as_completed(futures):
+            print(buffers[futures[future]].getvalue(), end="")
+            future.result()
     
     print("=" * 60)
     print("Tests completed!")